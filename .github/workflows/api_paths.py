@@ -0,0 +1,20 @@
+import re
+
+_ID_SEGMENTS = (
+    (re.compile(r"/blueprints/[^/]+"), "/blueprints/{blueprint}"),
+    # bulk and search are endpoints of their own, not entity identifiers
+    (re.compile(r"/entities/(?!(?:bulk|search)(?:/|$))[^/]+"), "/entities/{identifier}"),
+    (re.compile(r"/runs/[^/]+"), "/runs/{run_id}"),
+)
+
+
+def normalize_endpoint(path: str) -> str:
+    """
+    Collapse identifiers in an API path so calls aggregate per endpoint,
+    e.g. /actions/runs/r_1/logs -> /actions/runs/{run_id}/logs.
+    Shared by the request metrics and the benchmark stub API, so both name endpoints alike.
+    """
+    path = "/" + path.split("?", 1)[0].lstrip("/")
+    for pattern, replacement in _ID_SEGMENTS:
+        path = pattern.sub(replacement, path)
+    return path
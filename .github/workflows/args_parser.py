@@ -1,37 +1,87 @@
 import argparse
-from port import (add_ec2_to_environment, create_environment, post_log, get_port_token, create_k8s_cluster,
-                  restart_workload, get_logs_workload, resize_workload)
+import importlib
+
+from constants import (PORT_BULK_CHUNK_SIZE, PORT_BULK_MAX_WORKERS, PORT_COMMAND_DEADLINE, PORT_ORCHESTRATOR_SOCKET,
+                       PORT_REAP_MAX_DELETE, PORT_REAP_PAGE_SIZE)
 from env_var_helper import set_env_var
+from log_shipper import flush_logs
+from metrics import get_metrics
+from resilience import command_deadline
+
+
+def _lazy(module: str, name: str):
+    """
+    Return a callable that imports module.name on first call, so a command only pays
+    for the imports it actually uses (port.py pulls in requests/urllib3/ssl).
+    """
+    def call(*args):
+        return getattr(importlib.import_module(module), name)(*args)
+    return call
+
+
+def get_and_store_token(client_id: str, client_secret: str, export: bool = True):
+    from port import get_port_token
+
+    token = get_port_token(client_id, client_secret)
+    set_env_var("PORT_TOKEN", token, export=export)
+
+
+# command -> (handler, args -> positional handler arguments)
+COMMANDS = {
+    "get_token": (get_and_store_token, lambda a: (a.client_id, a.client_secret, not a.no_export)),
+    "post_log": (_lazy("port", "post_log"), lambda a: (a.message, a.token, a.run_id)),
+    "create_environment": (_lazy("port", "create_environment"), lambda a: (a.project, a.ttl, a.triggered_by)),
+    "add_ec2_to_environment": (_lazy("port", "add_ec2_to_environment"), lambda a: ()),
+    "create_k8s_cluster": (_lazy("port", "create_k8s_cluster"), lambda a: (a.project, a.ttl, a.triggered_by)),
+    "restart_workload": (_lazy("port", "restart_workload"), lambda a: ()),
+    "get_logs_workload": (_lazy("port", "get_logs_workload"), lambda a: ()),
+    "resize_workload": (_lazy("port", "resize_workload"), lambda a: ()),
+    "drain_log_spool": (_lazy("port", "drain_log_spool"), lambda a: (a.token, a.spool_dir)),
+    "provision_environments": (_lazy("port", "provision_environments"),
+                               lambda a: (a.spec, a.max_workers, a.chunk_size, a.force)),
+    "serve": (_lazy("orchestrator_daemon", "serve"), lambda a: (a.socket, a.idle_timeout)),
+    "get_entity": (_lazy("port", "get_entity"),
+                   lambda a: (a.blueprint, a.identifier, a.ttl, a.client_id, a.client_secret, a.output_key)),
+    "run_script": (_lazy("command_script", "run_script"), lambda a: (a.file, a.export_token)),
+    "reap_expired": (_lazy("ttl_reaper", "reap_expired"),
+                     lambda a: (a.blueprints, a.dry_run, a.max_delete, a.max_workers, a.page_size)),
+}
 
 
 class ArgsParser:
-    def __init__(self):
+    def __init__(self, argv=None):
         self.args = None
         self.parser = argparse.ArgumentParser(description="Port Automation Script")
+        self.parser.add_argument("--deadline", type=float, default=PORT_COMMAND_DEADLINE,
+                                 help="Seconds the command may spend before Port API calls fail fast (0 = none)")
         self.subparsers = self.parser.add_subparsers(dest="command")
         self.add_arguments_for_commands()
-        self.args = self.parser.parse_args()
+        self.args = self.parser.parse_args(argv)
 
     def execute_command(self):
-        if self.args.command == "get_token":
-            token = get_port_token(self.args.client_id, self.args.client_secret)
-            set_env_var("PORT_TOKEN", token)
-        elif self.args.command == "post_log":
-            post_log(self.args.message, self.args.token, self.args.run_id)
-        elif self.args.command == "create_environment":
-            create_environment(self.args.project, self.args.ttl, self.args.triggered_by)
-        elif self.args.command == "add_ec2_to_environment":
-            add_ec2_to_environment()
-        elif self.args.command == "create_k8s_cluster":
-            create_k8s_cluster(self.args.project, self.args.ttl, self.args.triggered_by)
-        elif self.args.command == "restart_workload":
-            restart_workload()
-        elif self.args.command == "get_logs_workload":
-            get_logs_workload()
-        elif self.args.command == "resize_workload":
-            resize_workload()
-        else:
+        try:
+            self.run()
+        finally:
+            get_metrics().emit()
+
+    def run(self):
+        """Dispatch the command under its --deadline and a metrics span, then flush queued run logs."""
+        # The daemon and command scripts run without a budget; each command they run gets its own
+        deadline = 0 if self.args.command in ("serve", "run_script") else self.args.deadline
+        with command_deadline(deadline):
+            try:
+                with get_metrics().span(self.args.command or "none"):
+                    self.dispatch()
+            finally:
+                flush_logs()
+
+    def dispatch(self):
+        command = COMMANDS.get(self.args.command)
+        if command is None:
             print("Invalid command")
+            return
+        handler, handler_args = command
+        handler(*handler_args(self.args))
 
     def add_arguments_for_commands(self):
         self._get_token_args()
@@ -42,6 +92,12 @@ class ArgsParser:
         self._restart_workload()
         self._resize_workload()
         self._get_logs_workload()
+        self._drain_log_spool()
+        self._provision_environments()
+        self._serve()
+        self._run_script()
+        self._get_entity()
+        self._reap_expired()
 
     def _create_environment_args(self):
         create_env_parser = self.subparsers.add_parser("create_environment")
@@ -65,6 +121,8 @@ class ArgsParser:
         get_token_parser = self.subparsers.add_parser("get_token")
         get_token_parser.add_argument("--client_id", required=True, help="Port client ID")
         get_token_parser.add_argument("--client_secret", required=True, help="Port client secret")
+        get_token_parser.add_argument("--no_export", action="store_true",
+                                      help="Keep the token in this process instead of writing it to GITHUB_ENV")
 
     def _create_k8s_cluster(self):
         create_env_parser = self.subparsers.add_parser("create_k8s_cluster")
@@ -83,4 +141,56 @@ class ArgsParser:
 
     def _get_logs_workload(self):
         create_env_parser = self.subparsers.add_parser("get_logs_workload")
-        create_env_parser.add_argument("--token", required=False, help="PORT JWT token")
\ No newline at end of file
+        create_env_parser.add_argument("--token", required=False, help="PORT JWT token")
+
+    def _drain_log_spool(self):
+        drain_parser = self.subparsers.add_parser("drain_log_spool")
+        drain_parser.add_argument("--token", required=False, help="PORT JWT token")
+        drain_parser.add_argument("--spool_dir", required=False, help="Directory holding the run log spool")
+
+    def _provision_environments(self):
+        provision_parser = self.subparsers.add_parser("provision_environments")
+        provision_parser.add_argument("--spec", required=True, help="Path to a JSON fleet spec file")
+        provision_parser.add_argument("--max_workers", type=int, default=PORT_BULK_MAX_WORKERS,
+                                      help="Maximum bulk requests in flight")
+        provision_parser.add_argument("--chunk_size", type=int, default=PORT_BULK_CHUNK_SIZE,
+                                      help="Entities per bulk request")
+        provision_parser.add_argument("--force", action="store_true",
+                                      help="Send every entity, even those the upsert index lists as unchanged")
+
+    def _serve(self):
+        serve_parser = self.subparsers.add_parser("serve", help="Run a warm orchestrator daemon on a Unix socket")
+        serve_parser.add_argument("--socket", default=PORT_ORCHESTRATOR_SOCKET, help="Unix socket path")
+        serve_parser.add_argument("--idle_timeout", type=float, default=0,
+                                  help="Exit after this many idle seconds (0 = run until stopped)")
+
+    def _run_script(self):
+        script_parser = self.subparsers.add_parser(
+            "run_script", help="Run a file of orchestrator commands, one per line, in this process")
+        script_parser.add_argument("--file", required=True, help="Command script path, or - for stdin")
+        script_parser.add_argument("--export_token", action="store_true",
+                                   help="Also write tokens from get_token to GITHUB_ENV for later steps")
+
+    def _get_entity(self):
+        get_entity_parser = self.subparsers.add_parser(
+            "get_entity", help="Fetch an entity through the local entity cache into GITHUB_OUTPUT")
+        get_entity_parser.add_argument("--blueprint", required=True, help="Blueprint identifier")
+        get_entity_parser.add_argument("--identifier", required=True, help="Entity identifier")
+        get_entity_parser.add_argument("--ttl", type=float, default=None,
+                                       help="Serve cached copies younger than this many seconds (0 = always revalidate)")
+        get_entity_parser.add_argument("--client_id", default="", help="Port client ID, used only on a cache miss")
+        get_entity_parser.add_argument("--client_secret", default="", help="Port client secret")
+        get_entity_parser.add_argument("--output_key", default="entity", help="GITHUB_OUTPUT key for the entity JSON")
+
+    def _reap_expired(self):
+        reap_parser = self.subparsers.add_parser(
+            "reap_expired", help="Delete time-bounded entities whose ttl has passed, dependents first")
+        reap_parser.add_argument("--blueprints", nargs="+", default=["environment", "cluster"],
+                                 help="Blueprints with ttl/time_bounded properties to scan")
+        reap_parser.add_argument("--dry_run", action="store_true", help="Only log what would be deleted")
+        reap_parser.add_argument("--max_delete", type=int, default=PORT_REAP_MAX_DELETE,
+                                 help="Delete at most this many expired entities, most overdue first (0 = no limit)")
+        reap_parser.add_argument("--max_workers", type=int, default=PORT_BULK_MAX_WORKERS,
+                                 help="Maximum delete requests in flight")
+        reap_parser.add_argument("--page_size", type=int, default=PORT_REAP_PAGE_SIZE,
+                                 help="Entities per search page")
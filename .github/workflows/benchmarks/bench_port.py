@@ -0,0 +1,89 @@
+"""Measure end-to-end latency and Port API request counts of the orchestrator flows.
+
+Starts the local stub Port API with the given latency, then runs each flow as its own
+`port_gha_orchestrator.py` process (as a workflow step would) with a synthetic
+PORT_CONTEXT, recording wall time and the requests the stub received per run.
+
+Usage:
+    python .github/workflows/benchmarks/bench_port.py [--latency_ms 20] [--repeat 10] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from stub_port_api import FAKE_TOKEN, StubPortAPI
+
+ORCHESTRATOR = Path(__file__).parent.parent / "port_gha_orchestrator.py"
+
+FLOWS = {
+    "create_environment": {"project": {"identifier": "bench"}, "ttl": "1 Day",
+                           "requires_ec_2": True, "requires_s_3": True},
+    "create_k8s_cluster": {"project": {"identifier": "bench"}, "ttl": "2 Hours", "cluster_name": "bench"},
+    "get_logs_workload": {"entity": {"identifier": "bench_workload"}},
+    "add_ec2_to_environment": {"environment": {"identifier": "environment_bench"}},
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def flow_env(api: StubPortAPI, flow: str, run: int, scratch: str) -> Dict[str, str]:
+    context = {"runId": f"r_bench_{flow}_{run}", "triggered_by": "bench", "inputs": FLOWS[flow]}
+    return dict(os.environ, PORT_API_URL=api.url, PORT_TOKEN=FAKE_TOKEN, PORT_CONTEXT=json.dumps(context),
+                PORT_TOKEN_CACHE_DIR="", PORT_LOG_SPOOL_DIR=os.path.join(scratch, "spool"),
+                PORT_UPSERT_INDEX_DIR=os.path.join(scratch, "upsert-index"))
+
+
+def run_flow(api: StubPortAPI, flow: str, repeat: int) -> Dict[str, object]:
+    wall_ms, requests_per_run, endpoints = [], [], {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for run in range(repeat):
+            api.reset_counts()
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, str(ORCHESTRATOR), flow], capture_output=True, text=True,
+                                  env=flow_env(api, flow, run, scratch))
+            wall_ms.append((time.perf_counter() - start) * 1000)
+            if proc.returncode != 0:
+                raise SystemExit(f"{flow} failed against the stub API:\n{proc.stderr}")
+            endpoints = api.reset_counts()
+            requests_per_run.append(sum(endpoints.values()))
+    return {"flow": flow, "runs": repeat, "median_ms": statistics.median(wall_ms),
+            "p95_ms": percentile(wall_ms, 95), "min_ms": min(wall_ms),
+            "requests_per_run": statistics.median(requests_per_run), "endpoints": endpoints}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", nargs="+", default=list(FLOWS), choices=list(FLOWS))
+    parser.add_argument("--latency_ms", type=float, default=20, help="Stub API latency per request")
+    parser.add_argument("--jitter_ms", type=float, default=0, help="Uniform extra latency per request")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with StubPortAPI(args.latency_ms, args.jitter_ms) as api:
+        for flow in args.flows:
+            result = run_flow(api, flow, args.repeat)
+            results.append(result)
+            print(f"{flow:<24} median {result['median_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                  f"requests/run {result['requests_per_run']:g}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "port_flows", "python": sys.version.split()[0],
+                       "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark json_utils.repair_json against the original per-character implementation.
+
+Usage:
+    python .github/workflows/benchmarks/bench_repair_json.py [--sizes 10KB 1MB 50MB] [--json results.json]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scorecard_failure_usecase"))
+
+from json_utils import repair_json
+
+SIZES = {"10KB": 10_000, "1MB": 1_000_000, "50MB": 50_000_000}
+
+
+def legacy_repair_json(json_str: str) -> Tuple[str, int]:
+    """The original character-at-a-time repair, kept as the baseline."""
+    result = []
+    chars_fixed = 0
+    in_string = False
+    escape_next = False
+    control_chars = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+    for char in json_str:
+        if escape_next:
+            result.append(char)
+            escape_next = False
+            continue
+        if char == '\\':
+            result.append(char)
+            escape_next = True
+            continue
+        if char == '"':
+            in_string = not in_string
+            result.append(char)
+            continue
+        if in_string and char in control_chars:
+            result.append(control_chars[char])
+            chars_fixed += 1
+        else:
+            result.append(char)
+
+    return ''.join(result), chars_fixed
+
+
+def make_payload(size: int) -> str:
+    """
+    Build a rule-entity-shaped JSON document of roughly `size` characters whose
+    multi-line template and description contain raw (unescaped) newlines and tabs.
+    """
+    template = "## Fix {{ Rule }}\n\nThe entity {{ s3 }} is failing.\n\t- {{ Description }}\n" * 4
+    item = {
+        "identifier": "rule_encryption_enabled",
+        "title": "Encryption enabled",
+        "team": ["platform"],
+        "properties": {"description": "Buckets must be encrypted.\nSee the runbook.", "template": template,
+                       "level": "Gold", "labels": ["security", "s3", "compliance"]},
+        "relations": {"scorecard": "production_readiness"},
+    }
+    unit = json.dumps(item, indent=2).replace('\\n', '\n').replace('\\t', '\t')
+    return '[' + ',\n'.join([unit] * max(1, size // (len(unit) + 2))) + ']'
+
+
+def measure(fn: Callable[[str], Tuple[str, int]], payload: str, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(timings), "peak_bytes": peak}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for label in args.sizes:
+        payload = make_payload(SIZES[label])
+        expected = legacy_repair_json(payload)
+        if repair_json(payload) != expected:
+            raise SystemExit(f"repair_json output differs from the legacy implementation at {label}")
+        for name, fn in (("legacy", legacy_repair_json), ("repair_json", repair_json)):
+            repeat = 1 if name == "legacy" and SIZES[label] > 1_000_000 else args.repeat
+            stats = measure(fn, payload, repeat)
+            results.append({"size": label, "chars": len(payload), "impl": name, **stats})
+            print(f"{label:>5} {name:<12} {stats['seconds'] * 1000:10.2f} ms  "
+                  f"peak {stats['peak_bytes'] / 1_000_000:8.2f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "repair_json", "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure throughput and peak memory of the scorecard JSON and template helpers.
+
+Covers json_utils.repair_json, json_utils.parse_json_with_repair (on payloads with raw
+control characters, so the repair path runs) and generate_template.generate_template_content
+(an uncached render, which compiles the template, and warm renders from the cache).
+
+Usage:
+    python .github/workflows/benchmarks/bench_scorecard.py [--sizes 10KB 1MB 10MB] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scorecard_failure_usecase"))
+
+from bench_repair_json import make_payload
+from generate_template import generate_template_content
+from json_utils import parse_json_with_repair, repair_json
+from template_engine import compile_template
+
+SIZES = {"10KB": 10_000, "1MB": 1_000_000, "10MB": 10_000_000}
+
+
+def make_template(size: int) -> str:
+    """A resolution template of roughly `size` characters with the usual placeholders."""
+    section = ("## {{ Rule }} failed on {{ s3 }}\n\n{{ Description }}\n\n"
+               "Owner: {{ Team }}. Re-run the scorecard after fixing {{ s3 }}.\n")
+    return section * max(1, size // len(section))
+
+
+def measure(fn: Callable[[], object], chars: int, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    seconds = min(timings)
+    return {"seconds": seconds, "mb_per_s": chars / seconds / 1_000_000 if seconds else 0.0, "peak_bytes": peak}
+
+
+def cases(size: int):
+    payload = make_payload(size)
+    template = make_template(size)
+    values = {"Rule": "Encryption enabled", "s3": "bucket-a", "Description": "Buckets must be encrypted.",
+              "Team": "platform"}
+    yield "repair_json", len(payload), lambda: repair_json(payload)
+    yield "parse_json_with_repair", len(payload), lambda: parse_json_with_repair(payload, "bench")
+    yield "compile_and_render_template", len(template), lambda: compile_template(template, None).render(values)
+    yield "generate_template_content", len(template), lambda: generate_template_content(
+        template, values["Rule"], values["s3"], values["Description"], {"Team": values["Team"]})
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for label in args.sizes:
+        for name, chars, fn in cases(SIZES[label]):
+            # parse_json_with_repair reports every repair on stderr
+            with contextlib.redirect_stderr(io.StringIO()):
+                stats = measure(fn, chars, args.repeat)
+            results.append({"size": label, "chars": chars, "function": name, **stats})
+            print(f"{label:>5} {name:<28} {stats['seconds'] * 1000:10.2f} ms  "
+                  f"{stats['mb_per_s']:9.1f} MB/s  peak {stats['peak_bytes'] / 1_000_000:8.2f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "scorecard", "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure port_gha_orchestrator start-up import cost against a tracked budget.
+
+Runs the orchestrator under `python -X importtime` for each scenario in
+startup_budget.json, sums the import time of everything loaded after interpreter
+start-up, and fails if a scenario exceeds its budget or imports a forbidden module.
+
+Usage:
+    python .github/workflows/benchmarks/bench_startup.py [--repeat 5] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+WORKFLOWS_DIR = Path(__file__).parent.parent
+ORCHESTRATOR = WORKFLOWS_DIR / "port_gha_orchestrator.py"
+BUDGET_FILE = Path(__file__).parent / "startup_budget.json"
+
+# Modules imported by the interpreter itself before the orchestrator starts
+_STARTUP_ROOTS = {"site", "encodings", "zipimport", "_frozen_importlib_external", "codecs", "io", "abc",
+                  "_signal", "encodings.utf_8", "_io", "marshal", "posix", "time"}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Set[str]]:
+    """
+    Return (milliseconds spent importing after start-up, set of every imported module).
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        modules.add(module)
+        if not name[1:].startswith(" ") and module not in _STARTUP_ROOTS:
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def run_scenario(argv: List[str], extra_env: Dict[str, str], repeat: int) -> Dict[str, object]:
+    import_ms, wall_ms, modules = [], [], set()
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, PORT_LOG_SPOOL_DIR=os.path.join(scratch, "spool"), **extra_env)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-X", "importtime", str(ORCHESTRATOR), *argv],
+                                  capture_output=True, text=True, env=env)
+            wall_ms.append((time.perf_counter() - start) * 1000)
+            ms, modules = parse_importtime(proc.stderr)
+            import_ms.append(ms)
+    return {"import_ms": statistics.median(import_ms), "wall_ms": statistics.median(wall_ms),
+            "modules": modules}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+
+    failures, results = [], []
+    for name, scenario in budget["scenarios"].items():
+        measured = run_scenario(scenario["argv"], scenario.get("env", {}), args.repeat)
+        forbidden = sorted(set(scenario.get("forbidden_modules", [])) & measured["modules"])
+        over = measured["import_ms"] > scenario["max_import_ms"]
+        status = "FAIL" if over or forbidden else "ok"
+        print(f"{status:>4} {name:<24} imports {measured['import_ms']:7.1f} ms "
+              f"(budget {scenario['max_import_ms']} ms)  wall {measured['wall_ms']:7.1f} ms"
+              + (f"  forbidden: {', '.join(forbidden)}" if forbidden else ""))
+        if status == "FAIL":
+            failures.append(name)
+        results.append({"scenario": name, "import_ms": measured["import_ms"], "wall_ms": measured["wall_ms"],
+                        "budget_ms": scenario["max_import_ms"], "forbidden_imported": forbidden})
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "startup", "python": sys.version.split()[0], "results": results}, f, indent=2)
+    if failures:
+        raise SystemExit(f"Start-up budget exceeded for: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
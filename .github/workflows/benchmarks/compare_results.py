@@ -0,0 +1,64 @@
+"""Compare two benchmark result files written with --json and flag regressions.
+
+Rows are matched on their non-metric fields (size, impl, function, flow, scenario...).
+A metric counts as a regression when the candidate is worse than the baseline by more
+than --threshold percent; the script then exits non-zero.
+
+Usage:
+    python .github/workflows/benchmarks/compare_results.py baseline.json candidate.json [--threshold 10]
+"""
+
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+# Metric -> True when higher is better
+METRICS = {"seconds": False, "peak_bytes": False, "mb_per_s": True, "median_ms": False, "p95_ms": False,
+           "min_ms": False, "requests_per_run": False, "import_ms": False, "wall_ms": False}
+
+
+def _key(row: Dict[str, object]) -> Tuple:
+    return tuple(sorted((k, v) for k, v in row.items() if k not in METRICS and isinstance(v, (str, int))))
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> List[str]:
+    """Print every metric change and return descriptions of the regressions."""
+    if baseline.get("benchmark") != candidate.get("benchmark"):
+        raise SystemExit(f"Cannot compare '{baseline.get('benchmark')}' with '{candidate.get('benchmark')}' results")
+    before = {_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in candidate["results"]:
+        old = before.get(_key(row))
+        if old is None:
+            continue
+        label = " ".join(str(v) for _, v in _key(row))
+        for metric, higher_is_better in METRICS.items():
+            if metric not in row or metric not in old or not old[metric]:
+                continue
+            change = (row[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            marker = "REGRESSION" if worse > threshold else ""
+            print(f"{label:<48} {metric:<16} {old[metric]:>14.4g} -> {row[metric]:<14.4g} {change:+7.1f}% {marker}")
+            if marker:
+                regressions.append(f"{label} {metric} {change:+.1f}%")
+    return regressions
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10, help="Allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        raise SystemExit(f"{len(regressions)} regressions over {args.threshold}%:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Load-test the orchestrator flows against a mock Port API with injected faults.
+
+Starts the stub Port API with a latency distribution and a fault plan, then launches
+--runs simulated action runs (each an orchestrator process with its own synthetic
+PORT_CONTEXT) with at most --concurrency in flight, alternating between the
+create_environment and create_k8s_cluster code paths.
+
+Reports run throughput, run latency percentiles, the share of failed runs, the
+requests the API received and two amplification figures:
+  request amplification = requests received / requests a fault-free run set would make
+Runs log in "sync" mode (one request per run log) so the request count does not depend on
+how the background log shipper happened to batch messages; amplification then measures
+retries only.
+  failure amplification = failed-run rate / injected per-request fault rate
+
+Usage:
+    python .github/workflows/benchmarks/load_test.py --runs 200 --concurrency 50 \\
+        --latency lognormal:40:0.7 --rate_429 0.02 --rate_5xx 0.02 --rate_reset 0.01 [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from bench_port import FLOWS, percentile
+from stub_port_api import FAKE_TOKEN, StubPortAPI, add_fault_arguments, faults_from_args
+
+ORCHESTRATOR = Path(__file__).parent.parent / "port_gha_orchestrator.py"
+LOAD_FLOWS = ("create_environment", "create_k8s_cluster")
+
+
+def run_once(api_url: str, flow: str, run: int, scratch: str, timeout: float) -> Dict[str, object]:
+    context = {"runId": f"r_load_{run}", "triggered_by": f"load_{run % 17}",
+               "inputs": dict(FLOWS[flow], project={"identifier": f"load_{run}"})}
+    env = dict(os.environ, PORT_API_URL=api_url, PORT_TOKEN=FAKE_TOKEN, PORT_CONTEXT=json.dumps(context),
+               PORT_LOG_MODE="sync", PORT_TOKEN_CACHE_DIR="", PORT_LOG_SPOOL_DIR=os.path.join(scratch, f"spool_{run}"),
+               PORT_UPSERT_INDEX_DIR=os.path.join(scratch, "upsert-index"))
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, str(ORCHESTRATOR), flow], capture_output=True, text=True,
+                              env=env, timeout=timeout)
+        ok, error = proc.returncode == 0, proc.stderr.strip().splitlines()[-1:] if proc.returncode else []
+    except subprocess.TimeoutExpired:
+        ok, error = False, [f"timed out after {timeout}s"]
+    return {"flow": flow, "ok": ok, "seconds": time.perf_counter() - start, "error": error[0] if error else ""}
+
+
+def baseline_requests(api: StubPortAPI, scratch: str) -> Dict[str, float]:
+    """Requests one fault-free run of each flow makes, measured with faults switched off."""
+    faults, api.faults = api.faults, type(api.faults)()
+    try:
+        per_flow = {}
+        for flow in LOAD_FLOWS:
+            api.reset_counts()
+            run_once(api.url, flow, -1, scratch, timeout=60)
+            per_flow[flow] = sum(api.reset_counts().values())
+        return per_flow
+    finally:
+        api.faults = faults
+
+
+def summarize(runs: List[Dict[str, object]], elapsed: float, received: int, expected: float,
+              faults: Dict[str, int], fault_rate: float) -> Dict[str, object]:
+    latencies = [r["seconds"] * 1000 for r in runs]
+    failed = [r for r in runs if not r["ok"]]
+    failed_rate = len(failed) / len(runs)
+    errors: Dict[str, int] = {}
+    for r in failed:
+        errors[r["error"]] = errors.get(r["error"], 0) + 1
+    return {
+        "runs": len(runs),
+        "failed_runs": len(failed),
+        "failed_run_rate": failed_rate,
+        "runs_per_s": len(runs) / elapsed,
+        "latency_ms": {"p50": percentile(latencies, 50), "p90": percentile(latencies, 90),
+                       "p99": percentile(latencies, 99), "max": max(latencies),
+                       "mean": statistics.fmean(latencies)},
+        "requests_received": received,
+        "requests_expected": expected,
+        "request_amplification": received / expected if expected else None,
+        "injected_faults": faults,
+        "failure_amplification": failed_rate / fault_rate if fault_rate else None,
+        "top_errors": dict(sorted(errors.items(), key=lambda item: -item[1])[:5]),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--latency_ms", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds before a run is counted as failed")
+    add_fault_arguments(parser)
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    args = parser.parse_args(argv)
+
+    latency, faults = faults_from_args(args)
+    fault_rate = faults.rate_429 + faults.rate_5xx + faults.rate_reset
+    flows = [LOAD_FLOWS[run % len(LOAD_FLOWS)] for run in range(args.runs)]
+
+    with StubPortAPI(args.latency_ms, latency=latency, faults=faults) as api, \
+            tempfile.TemporaryDirectory() as scratch:
+        per_flow = baseline_requests(api, scratch)
+        api.fault_counts.clear()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            runs = list(pool.map(lambda item: run_once(api.url, item[1], item[0], scratch, args.timeout),
+                                 enumerate(flows)))
+        elapsed = time.perf_counter() - start
+        received = sum(api.reset_counts().values())
+        summary = summarize(runs, elapsed, received, sum(per_flow[flow] for flow in flows),
+                            dict(api.fault_counts), fault_rate)
+
+    latency_ms = summary["latency_ms"]
+    print(f"runs {summary['runs']}  failed {summary['failed_runs']} ({summary['failed_run_rate']:.1%})  "
+          f"throughput {summary['runs_per_s']:.1f} runs/s")
+    print(f"run latency p50 {latency_ms['p50']:.0f} ms  p90 {latency_ms['p90']:.0f} ms  "
+          f"p99 {latency_ms['p99']:.0f} ms  max {latency_ms['max']:.0f} ms")
+    print(f"requests {summary['requests_received']} (fault-free {summary['requests_expected']:g}, "
+          f"amplification {summary['request_amplification'] or 0:.2f}x)  injected faults {summary['injected_faults']}")
+    if summary["failure_amplification"] is not None:
+        print(f"failure amplification {summary['failure_amplification']:.1f}x "
+              f"({summary['failed_run_rate']:.1%} of runs failed at a {fault_rate:.1%} per-request fault rate)")
+    for error, count in summary["top_errors"].items():
+        print(f"  {count:>5}  {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "load_test", "python": sys.version.split()[0], "config": vars(args),
+                       "results": [summary]}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Local stand-in for the Port API used by the benchmarks.
+
+Answers the endpoints port.py calls (auth, entity create/upsert, bulk create, run logs,
+entity reads with ETag revalidation, patches and deletes) with plausible bodies after a configurable latency,
+and counts requests per method and endpoint so a benchmark can report how many calls
+a flow makes. For load tests the latency can follow a distribution (see parse_latency)
+and a FaultPlan can answer a share of requests with 429, 5xx or a connection reset.
+
+Usage as a library:
+    with StubPortAPI(latency_ms=20) as api:
+        os.environ["PORT_API_URL"] = api.url
+        ...
+        api.counts  # {"POST /v1/blueprints/{blueprint}/entities": 3, ...}
+
+Or standalone:
+    python .github/workflows/benchmarks/stub_port_api.py --port 8765 --latency lognormal:30:0.6 --rate_429 0.05
+"""
+
+import argparse
+import json
+import math
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Share the endpoint normaliser with the orchestrator's metrics (one level up)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api_paths import normalize_endpoint
+
+FAKE_TOKEN = "stub.eyJleHAiOjQxMDI0NDQ4MDB9.sig"
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Build a latency sampler (milliseconds) from a spec:
+    fixed:MS, uniform:LOW:HIGH, exp:MEAN or lognormal:MEDIAN:SIGMA.
+    """
+    kind, *params = spec.split(":")
+    try:
+        values = [float(p) for p in params]
+        if kind == "fixed":
+            (ms,) = values
+            return lambda: ms
+        if kind == "uniform":
+            low, high = values
+            return lambda: random.uniform(low, high)
+        if kind == "exp":
+            (mean,) = values
+            return lambda: random.expovariate(1 / mean) if mean else 0.0
+        if kind == "lognormal":
+            median, sigma = values
+            mu = math.log(median) if median else 0.0
+            return lambda: random.lognormvariate(mu, sigma) if median else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec '{spec}', expected fixed:MS, uniform:LOW:HIGH, exp:MEAN "
+                     f"or lognormal:MEDIAN:SIGMA")
+
+
+class FaultPlan:
+    """Share of requests (0..1) answered with 429, a 5xx, or a dropped connection."""
+
+    def __init__(self, rate_429: float = 0, rate_5xx: float = 0, rate_reset: float = 0, retry_after: float = 1):
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_reset = rate_reset
+        self.retry_after = retry_after
+
+    def pick(self) -> Optional[str]:
+        """Return '429', '5xx', 'reset' or None for a healthy response."""
+        roll = random.random()
+        for fault, rate in (("429", self.rate_429), ("5xx", self.rate_5xx), ("reset", self.rate_reset)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StubServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw) if raw else None
+
+    def _reply(self, status: int, body: dict, etag: str = ""):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _reset(self):
+        # SO_LINGER 0 makes close() send RST, which clients see as a connection reset
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.close_connection = True
+
+    def _handle(self, method: str):
+        body = self._read_body() if method in ("POST", "PATCH") else None
+        api = self.server.api
+        api.record(method, self.path)
+        api.delay()
+        fault = api.faults.pick()
+        if fault:
+            api.record_fault(fault)
+        if fault == "reset":
+            return self._reset()
+        if fault == "429":
+            self.send_response(429)
+            self.send_header("Retry-After", f"{api.faults.retry_after:g}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if fault == "5xx":
+            return self._reply(random.choice((500, 502, 503)), {"ok": False, "error": "injected_fault"})
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/auth/access_token"):
+            return self._reply(200, {"ok": True, "accessToken": FAKE_TOKEN, "expiresIn": 3600})
+        if path.endswith("/entities/bulk"):
+            entities = (body or {}).get("entities", [])
+            return self._reply(207, {"ok": True, "errors": [], "entities": [
+                {"identifier": e.get("identifier"), "index": i, "created": True} for i, e in enumerate(entities)]})
+        if method == "POST" and path.endswith("/entities"):
+            return self._reply(201, {"ok": True, "entity": body})
+        if method == "GET" and "/entities/" in path:
+            etag = f'"{abs(hash(path)):x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            return self._reply(200, {"ok": True, "entity": {"identifier": path.rsplit("/", 1)[-1]}}, etag)
+        if "/entities/" in path:
+            identifier = path.rsplit("/", 1)[-1]
+            return self._reply(200, {"ok": True, "entity": {"identifier": identifier, **(body or {})}})
+        return self._reply(200, {"ok": True})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    api: "StubPortAPI"
+
+
+class StubPortAPI:
+    """A threaded stub Port API on 127.0.0.1, usable as a context manager."""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, port: int = 0,
+                 latency: Optional[Callable[[], float]] = None, faults: Optional[FaultPlan] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency = latency
+        self.faults = faults or FaultPlan()
+        self.counts: Counter = Counter()
+        self.fault_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = _StubServer(("127.0.0.1", port), _Handler)
+        self._server.api = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record(self, method: str, path: str):
+        with self._lock:
+            self.counts[f"{method} {normalize_endpoint(path)}"] += 1
+
+    def record_fault(self, fault: str):
+        with self._lock:
+            self.fault_counts[fault] += 1
+
+    def delay(self):
+        latency_ms = self.latency() if self.latency else self.latency_ms
+        seconds = (latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def reset_counts(self) -> Dict[str, int]:
+        """Return the counts so far and start counting from zero."""
+        with self._lock:
+            counts, self.counts = dict(self.counts), Counter()
+        return counts
+
+    def start(self) -> "StubPortAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubPortAPI":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", help="Latency distribution, e.g. lognormal:30:0.6 (overrides --latency_ms)")
+    parser.add_argument("--rate_429", type=float, default=0, help="Share of requests answered with 429")
+    parser.add_argument("--rate_5xx", type=float, default=0, help="Share of requests answered with 500/502/503")
+    parser.add_argument("--rate_reset", type=float, default=0, help="Share of connections reset mid-request")
+    parser.add_argument("--retry_after", type=float, default=1, help="Retry-After seconds sent with 429")
+
+
+def faults_from_args(args: argparse.Namespace):
+    """Return (latency sampler or None, FaultPlan) from add_fault_arguments options."""
+    latency = parse_latency(args.latency) if args.latency else None
+    return latency, FaultPlan(args.rate_429, args.rate_5xx, args.rate_reset, args.retry_after)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency_ms", type=float, default=0)
+    parser.add_argument("--jitter_ms", type=float, default=0)
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+    api = StubPortAPI(args.latency_ms, args.jitter_ms, args.port, *faults_from_args(args))
+    print(f"Stub Port API listening on {api.url}", flush=True)
+    api.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
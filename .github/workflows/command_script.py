@@ -0,0 +1,63 @@
+"""
+Run several orchestrator commands in one process.
+
+A command script has one ArgsParser command per line, e.g.
+
+    get_token --client_id $PORT_CLIENT_ID --client_secret $PORT_CLIENT_SECRET
+    create_environment
+    add_ec2_to_environment
+
+Lines are split with shell quoting rules; blank lines and lines starting with # are
+ignored. $VARS are expanded just before each command runs, so later lines see the
+PORT_TOKEN set by an earlier get_token. All commands share the pooled HTTP session and
+the decoded run context, and the first failing command stops the script. Each line runs
+under its own deadline (its --deadline, or PORT_COMMAND_DEADLINE) and flushes its run
+logs before the next line starts; the script as a whole has no deadline.
+"""
+import logging
+import os
+import shlex
+import sys
+from typing import List, Tuple
+
+NESTED_COMMANDS = ("run_script", "serve")
+
+
+def read_script(path: str) -> List[Tuple[int, List[str]]]:
+    """Return (line number, argv) for every command in the script; '-' reads stdin."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    commands = []
+    for line_no, line in enumerate(lines, start=1):
+        argv = shlex.split(line, comments=True)
+        if not argv:
+            continue
+        commands.append((line_no, argv))
+    return commands
+
+
+def run_script(path: str, export_token: bool = False):
+    """Run each command of the script in order, stopping at the first failure."""
+    from args_parser import ArgsParser
+
+    commands = read_script(path)
+    # Reject usage errors on any line before the first command has side effects.
+    for line_no, argv in commands:
+        name = ArgsParser(argv).args.command
+        if name in NESTED_COMMANDS:
+            raise RuntimeError(f"{path}:{line_no}: '{name}' cannot be used inside a command script.")
+    logging.info(f"Running {len(commands)} commands from {path}")
+    for step, (line_no, argv) in enumerate(commands, start=1):
+        argv = [os.path.expandvars(arg) for arg in argv]
+        command = ArgsParser(argv)
+        if command.args.command == "get_token" and not export_token:
+            command.args.no_export = True
+        logging.info(f"[{step}/{len(commands)}] {command.args.command}")
+        try:
+            command.run()
+        except (Exception, SystemExit):
+            logging.error(f"{path}:{line_no}: '{argv[0]}' failed, stopping the script.")
+            raise
@@ -1,2 +1,67 @@
-PORT_API_URL = "https://api.getport.io/v1"
+import os
 
+PORT_API_URL = os.getenv("PORT_API_URL", "https://api.getport.io/v1")
+
+# HTTP client tuning (seconds / pool sizes), overridable per job through the environment
+PORT_CONNECT_TIMEOUT = float(os.getenv("PORT_CONNECT_TIMEOUT", "5"))
+PORT_READ_TIMEOUT = float(os.getenv("PORT_READ_TIMEOUT", "30"))
+PORT_POOL_SIZE = int(os.getenv("PORT_POOL_SIZE", "10"))
+
+# Run log delivery: "async" ships post_log messages from a background thread, "sync" sends them inline,
+# "spool" appends them to PORT_LOG_SPOOL_DIR for a later drain_log_spool step
+PORT_LOG_MODE = os.getenv("PORT_LOG_MODE", "async")
+PORT_LOG_QUEUE_SIZE = int(os.getenv("PORT_LOG_QUEUE_SIZE", "1000"))
+PORT_LOG_MAX_BATCH_CHARS = int(os.getenv("PORT_LOG_MAX_BATCH_CHARS", "4000"))
+PORT_LOG_SPOOL_DIR = os.getenv("PORT_LOG_SPOOL_DIR", ".port-log-spool")
+
+# Access-token cache; set PORT_TOKEN_CACHE_DIR to an empty string to disable it
+PORT_TOKEN_CACHE_DIR = os.getenv("PORT_TOKEN_CACHE_DIR",
+                                 os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "port"))
+PORT_TOKEN_REFRESH_MARGIN = int(os.getenv("PORT_TOKEN_REFRESH_MARGIN", "300"))
+
+# Bulk entity upserts: the bulk endpoint accepts at most 20 entities per request
+PORT_BULK_CHUNK_SIZE = int(os.getenv("PORT_BULK_CHUNK_SIZE", "20"))
+PORT_BULK_MAX_WORKERS = int(os.getenv("PORT_BULK_MAX_WORKERS", "4"))
+
+# Worker pool size for dependency-graph provisioning flows (see task_graph.py)
+PORT_GRAPH_MAX_WORKERS = int(os.getenv("PORT_GRAPH_MAX_WORKERS", "8"))
+
+# Unix socket of the optional warm orchestrator daemon (see orchestrator_daemon.py)
+PORT_ORCHESTRATOR_SOCKET = os.getenv("PORT_ORCHESTRATOR_SOCKET", "/tmp/port-orchestrator.sock")
+
+# Port API call metrics: a markdown summary is appended to GITHUB_STEP_SUMMARY after each command
+# (set PORT_METRICS_STEP_SUMMARY=false to skip it); PORT_METRICS_TEXTFILE names an optional
+# Prometheus textfile-collector output
+PORT_METRICS_STEP_SUMMARY = os.getenv("PORT_METRICS_STEP_SUMMARY", "true").lower() == "true"
+PORT_METRICS_TEXTFILE = os.getenv("PORT_METRICS_TEXTFILE", "")
+
+# Port API request scheduling (see rate_limit.py): client-side token bucket (0 disables it),
+# adaptive concurrency ceiling, and retries with jittered exponential backoff for 429/5xx/connection errors
+PORT_RATE_LIMIT_RPS = float(os.getenv("PORT_RATE_LIMIT_RPS", "20"))
+PORT_RATE_LIMIT_BURST = float(os.getenv("PORT_RATE_LIMIT_BURST", "40"))
+PORT_MAX_CONCURRENCY = int(os.getenv("PORT_MAX_CONCURRENCY", "16"))
+PORT_RETRY_MAX_ATTEMPTS = int(os.getenv("PORT_RETRY_MAX_ATTEMPTS", "4"))
+PORT_RETRY_BASE_DELAY = float(os.getenv("PORT_RETRY_BASE_DELAY", "0.5"))
+PORT_RETRY_MAX_DELAY = float(os.getenv("PORT_RETRY_MAX_DELAY", "30"))
+
+# Circuit breaker shared by all Port API calls in a process, and the default time budget per
+# orchestrator command in seconds (0 disables it; see resilience.py)
+PORT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("PORT_BREAKER_FAILURE_THRESHOLD", "5"))
+PORT_BREAKER_RESET_TIMEOUT = float(os.getenv("PORT_BREAKER_RESET_TIMEOUT", "15"))
+PORT_COMMAND_DEADLINE = float(os.getenv("PORT_COMMAND_DEADLINE", "600"))
+
+# Read-through cache for entity GETs (see entity_cache.py); lives in the workspace so actions/cache
+# can restore it. An empty PORT_ENTITY_CACHE_DIR disables it.
+PORT_ENTITY_CACHE_DIR = os.getenv("PORT_ENTITY_CACHE_DIR", ".port-entity-cache")
+PORT_ENTITY_CACHE_TTL = float(os.getenv("PORT_ENTITY_CACHE_TTL", "3600"))
+PORT_ENTITY_CACHE_MAX_BYTES = int(os.getenv("PORT_ENTITY_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Digests of entity payloads already written to Port (see upsert_index.py), kept in the workspace; they
+# only persist across jobs if a workflow caches the directory. Entries older than the TTL are upserted
+# in full again. An empty PORT_UPSERT_INDEX_DIR disables it.
+PORT_UPSERT_INDEX_DIR = os.getenv("PORT_UPSERT_INDEX_DIR", ".port-upsert-index")
+PORT_UPSERT_INDEX_TTL = float(os.getenv("PORT_UPSERT_INDEX_TTL", str(24 * 3600)))
+
+# TTL reaper (see ttl_reaper.py): entities per search page and the most expired entities deleted per run
+PORT_REAP_PAGE_SIZE = int(os.getenv("PORT_REAP_PAGE_SIZE", "500"))
+PORT_REAP_MAX_DELETE = int(os.getenv("PORT_REAP_MAX_DELETE", "5000"))
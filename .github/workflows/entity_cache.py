@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Callable, Mapping, Optional
+from urllib.parse import quote
+
+from constants import PORT_ENTITY_CACHE_DIR, PORT_ENTITY_CACHE_TTL, PORT_ENTITY_CACHE_MAX_BYTES
+from env_var_helper import get_run_context
+
+# Returns the Port API headers to use when the cache has to go to the network
+HeadersFactory = Callable[[], Optional[Mapping[str, str]]]
+
+
+def _default_headers() -> Optional[Mapping[str, str]]:
+    return get_run_context().auth_headers
+
+
+class EntityCache:
+    """
+    Read-through on-disk cache of Port entities keyed by (blueprint, identifier).
+
+    Entries younger than ttl seconds are served without touching the API. Older entries
+    are revalidated with If-None-Match / If-Modified-Since when the API sent an ETag or
+    Last-Modified, so an unchanged entity costs a 304 instead of a full body; otherwise
+    they are refetched. If the API cannot be reached a stale entry is served rather than
+    failing. The directory is plain JSON files, suitable for actions/cache, and is kept
+    under max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str = PORT_ENTITY_CACHE_DIR, ttl: float = PORT_ENTITY_CACHE_TTL,
+                 max_bytes: int = PORT_ENTITY_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def get(self, blueprint: str, identifier: str, headers: HeadersFactory = _default_headers,
+            ttl: Optional[float] = None) -> dict:
+        """
+        Return the entity, from the cache when fresh enough, otherwise from the Port API.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        entry = self._read(blueprint, identifier) if self.cache_dir else None
+        if entry is not None and time.time() - entry["fetched_at"] < ttl:
+            logging.debug(f"Entity cache hit for {blueprint}/{identifier}")
+            return entry["entity"]
+        return self._fetch(blueprint, identifier, headers, entry)
+
+    def invalidate(self, blueprint: str, identifier: str):
+        if not self.cache_dir:
+            return
+        try:
+            os.unlink(self._path(blueprint, identifier))
+        except FileNotFoundError:
+            pass
+
+    def _fetch(self, blueprint: str, identifier: str, headers: HeadersFactory, entry: Optional[dict]) -> dict:
+        from port_client import get_port_client
+
+        request_headers = dict(headers() or {})
+        if entry is not None and entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        path = f"/blueprints/{quote(blueprint, safe='')}/entities/{quote(identifier, safe='')}"
+        response = get_port_client().get(path, headers=request_headers)
+        status = response.status_code if response is not None else None
+        if status == 304 and entry is not None:
+            logging.debug(f"Entity {blueprint}/{identifier} not modified, refreshing cache entry")
+            entry["fetched_at"] = time.time()
+            self._write(blueprint, identifier, entry)
+            return entry["entity"]
+        if status == 200:
+            entity = response.json()["entity"]
+            if self.cache_dir:
+                self._write(blueprint, identifier, {
+                    "blueprint": blueprint, "identifier": identifier, "fetched_at": time.time(),
+                    "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+                    "entity": entity})
+            return entity
+        if status == 404:
+            self.invalidate(blueprint, identifier)
+            raise RuntimeError(f"Entity {blueprint}/{identifier} not found")
+        if entry is not None and (status is None or status >= 500):
+            logging.warning(f"Port API unavailable ({status or 'no response'}), "
+                            f"serving cached {blueprint}/{identifier} fetched at {time.ctime(entry['fetched_at'])}")
+            return entry["entity"]
+        raise RuntimeError(f"Failed to fetch entity {blueprint}/{identifier} ({status or 'no response'})")
+
+    def _path(self, blueprint: str, identifier: str) -> str:
+        key = hashlib.sha256(f"{blueprint}\0{identifier}".encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, blueprint: str, identifier: str) -> Optional[dict]:
+        path = self._path(blueprint, identifier)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, ValueError):
+            return None
+        if entry.get("blueprint") != blueprint or entry.get("identifier") != identifier:
+            return None
+        return entry
+
+    def _write(self, blueprint: str, identifier: str, entry: dict):
+        path = self._path(blueprint, identifier)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            logging.warning(f"Could not write entity cache entry for {blueprint}/{identifier}: {e}")
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 80% of max_bytes."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if item.name.endswith(".json"):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes * 0.8:
+                break
+
+
+_entity_cache = EntityCache()
+
+
+def get_entity_cache() -> EntityCache:
+    return _entity_cache
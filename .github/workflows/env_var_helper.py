@@ -2,28 +2,137 @@ import json
 import logging
 import os
 
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from github_output import OutputSink
+
+# RunContext._data before PORT_CONTEXT has been decoded (None means decoding failed)
+_UNDECODED = object()
+
+
+class RunContext:
+    """
+    Process-wide, lazily decoded view of the Port action run context.
+
+    PORT_CONTEXT is decoded once on first access, and a missing or invalid context is
+    remembered (and reported once) rather than decoded again. The Port API auth headers
+    are built once from PORT_TOKEN. Call invalidate() after either variable changes.
+    """
+
+    def __init__(self, context_var: str = 'PORT_CONTEXT', token_var: str = 'PORT_TOKEN'):
+        self._context_var = context_var
+        self._token_var = token_var
+        self._data: Any = _UNDECODED
+        self._error: Optional[str] = None
+        self._reported = False
+        self._auth_headers: Optional[Mapping[str, str]] = None
+
+    @property
+    def data(self) -> Optional[Mapping[str, Any]]:
+        """
+        The decoded context as a read-only view (nested objects included), or None if
+        PORT_CONTEXT is missing or invalid. The context is shared by every caller in the process.
+        """
+        data = self.optional_data
+        if data is None and not self._reported:
+            logging.critical(self._error)
+            self._reported = True
+        return data
+
+    @property
+    def optional_data(self) -> Optional[Mapping[str, Any]]:
+        """Like data, but without reporting a missing context, for callers that run without one."""
+        if self._data is _UNDECODED:
+            try:
+                self._data = _read_only(_decode_port_context(os.getenv(self._context_var)))
+            except ValueError as e:
+                self._data, self._error = None, str(e)
+                logging.debug(self._error)
+        return self._data
+
+    @property
+    def run_id(self) -> str:
+        return self._require()["runId"]
+
+    @property
+    def inputs(self) -> Mapping[str, Any]:
+        return self._require().get("inputs", MappingProxyType({}))
+
+    @property
+    def triggered_by(self) -> Optional[str]:
+        return self._require().get("triggered_by")
+
+    @property
+    def auth_headers(self) -> Optional[Mapping[str, str]]:
+        """Read-only Port API headers for PORT_TOKEN, or None if the token is not set."""
+        if self._auth_headers is None:
+            token = get_env_var(self._token_var)
+            if token:
+                self._auth_headers = MappingProxyType(build_port_api_headers(token))
+        return self._auth_headers
+
+    def invalidate(self, context: bool = True, token: bool = True):
+        if context:
+            self._data, self._error, self._reported = _UNDECODED, None, False
+        if token:
+            self._auth_headers = None
+
+    def _require(self) -> Mapping[str, Any]:
+        data = self.data
+        if data is None:
+            raise RuntimeError("PORT_CONTEXT environment variable is not set or invalid.")
+        return data
+
+
+def _read_only(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_read_only(item) for item in value)
+    return value
+
+
+_run_context = RunContext()
+
+
+def get_run_context() -> RunContext:
+    return _run_context
 
 
 def get_port_context():
-    try:
-        port_context_raw = get_env_var('PORT_CONTEXT')
+    """
+    Return the decoded PORT_CONTEXT, decoding it only on the first call.
+    """
+    return _run_context.data
 
-        if not port_context_raw:
-            logging.critical("PORT_CONTEXT environment variable is not set or empty.")
-            raise RuntimeError("PORT_CONTEXT environment variable is not set or empty.")
 
-        parsed_port_context = json.loads(
-            port_context_raw.replace("\\", '').replace('"{', '{').replace('}"', '}'))
+def get_optional_port_context():
+    """
+    Return the decoded PORT_CONTEXT, or None without logging an error when it is not set
+    (spec-file and scheduled runs have no Port action run).
+    """
+    return _run_context.optional_data
 
-        return parsed_port_context
 
+def _decode_port_context(port_context_raw: Optional[str]) -> dict:
+    """Parse PORT_CONTEXT; raises ValueError if it is missing or not a JSON object."""
+    if not port_context_raw:
+        raise ValueError("PORT_CONTEXT environment variable is not set or empty.")
+    try:
+        parsed_port_context = json.loads(
+            port_context_raw.replace("\\", '').replace('"{', '{').replace('}"', '}'))
     except json.JSONDecodeError as e:
-        logging.critical(f"Invalid JSON format in PORT_CONTEXT: {e}")
-        return None
-    except Exception as e:
-        logging.critical(f"Unexpected error: {e}")
-        return None
+        raise ValueError(f"Invalid JSON format in PORT_CONTEXT: {e}")
+    if not isinstance(parsed_port_context, dict):
+        raise ValueError("Invalid PORT_CONTEXT: expected a JSON object.")
+    return parsed_port_context
+
+def build_port_api_headers(token: str) -> dict:
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {token}"
+    }
 
 def get_env_var(var_name: str) -> Optional[str]:
     try:
@@ -38,13 +147,20 @@ def get_env_var(var_name: str) -> Optional[str]:
         logging.error(f"Error retrieving environment variable '{var_name}': {e}")
         return None
 
-def set_env_var(name: str, value: str):
-    """Writes an environment variable to GITHUB_ENV for subsequent steps."""
+def set_env_var(name: str, value: str, export: bool = True):
+    """
+    Sets an environment variable for this process and, when export is True, writes it to
+    GITHUB_ENV for subsequent steps.
+    """
     os.environ[name] = value #important for current step (the other GHA steps handled next)
+    if name in ('PORT_CONTEXT', 'PORT_TOKEN'):
+        _run_context.invalidate(context=name == 'PORT_CONTEXT', token=name == 'PORT_TOKEN')
+    if not export:
+        return
     github_env = os.getenv('GITHUB_ENV', default=None)
     if github_env:
-        with open(github_env, 'a') as env_file:
-            logging.debug(f"Setting environment variable '{name}' in GITHUB_ENV.")
-            env_file.write(f"{name}={value}\n")
+        logging.debug(f"Setting environment variable '{name}' in GITHUB_ENV.")
+        with OutputSink(github_env) as env_sink:
+            env_sink.set(name, value)
     else:
         raise RuntimeError("GITHUB_ENV is not available. Are you running in a GitHub Actions environment?")
\ No newline at end of file
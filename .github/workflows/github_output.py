@@ -0,0 +1,85 @@
+import logging
+import os
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX runners write without the advisory lock
+    fcntl = None
+
+
+def heredoc_delimiter(value: str) -> str:
+    """
+    Return a random heredoc delimiter that does not occur anywhere in value.
+    """
+    while True:
+        delimiter = f"ghadelimiter_{os.urandom(16).hex()}"
+        if delimiter not in value:
+            return delimiter
+
+
+class OutputSink:
+    """
+    Buffered writer for GitHub Actions key/value files (GITHUB_OUTPUT, GITHUB_ENV).
+
+    Values are buffered in memory and written by flush() with a single append write
+    under an exclusive advisory lock, so concurrent workers never interleave records.
+    Multi-line values use heredoc syntax with a collision-safe random delimiter.
+    Use as a context manager to flush on exit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer: List[str] = []
+
+    def set(self, key: str, value: str):
+        value = str(value)
+        if '\n' in value or '\r' in value:
+            delimiter = heredoc_delimiter(value)
+            self._buffer.append(f"{key}<<{delimiter}\n{value}\n{delimiter}\n")
+        else:
+            self._buffer.append(f"{key}={value}\n")
+
+    def flush(self):
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer).encode('utf-8')
+        self._buffer.clear()
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            locked = _lock(fd)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                if locked:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+
+def _lock(fd: int) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return True
+    except OSError as e:
+        # e.g. /dev/stdout attached to something that does not support locks
+        logging.debug(f"Could not lock GitHub output file: {e}")
+        return False
+
+
+def github_output_sink(default: Optional[str] = '/dev/stdout') -> OutputSink:
+    """
+    Return a sink for GITHUB_OUTPUT, or for `default` outside GitHub Actions.
+    """
+    return OutputSink(os.environ.get('GITHUB_OUTPUT', default))
@@ -0,0 +1,121 @@
+import atexit
+import logging
+import queue
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from constants import PORT_LOG_QUEUE_SIZE, PORT_LOG_MAX_BATCH_CHARS
+
+# (run_id, token, message)
+LogItem = Tuple[str, str, str]
+
+_STOP = object()
+
+
+class LogShipper:
+    """
+    Ships run log messages to Port from a background thread.
+
+    Messages are sent in the order they were submitted. Consecutive messages for the
+    same run (and token) are joined with newlines into a single log request, up to
+    max_batch_chars per request. The queue is bounded, so a stalled API applies
+    back-pressure to the caller instead of growing memory without limit.
+    """
+
+    def __init__(self, send: Callable[[str, str, str], bool], max_queue: int = PORT_LOG_QUEUE_SIZE,
+                 max_batch_chars: int = PORT_LOG_MAX_BATCH_CHARS):
+        self._send = send
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._max_batch_chars = max_batch_chars
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, run_id: str, message: str, token: str = ""):
+        self._ensure_started()
+        self._queue.put((run_id, token, message))
+
+    def flush(self):
+        """
+        Block until every submitted message has been sent (or has failed).
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """
+        Flush outstanding messages and stop the worker thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="port-log-shipper", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pending = None
+        while True:
+            item = pending if pending is not None else self._queue.get()
+            pending = None
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch: List[LogItem] = [item]
+            size = len(item[2])
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if (nxt is _STOP or nxt[:2] != item[:2]
+                        or size + len(nxt[2]) + 1 > self._max_batch_chars):
+                    pending = nxt
+                    break
+                batch.append(nxt)
+                size += len(nxt[2]) + 1
+
+            run_id, token = item[0], item[1]
+            message = "\n".join(entry[2] for entry in batch)
+            try:
+                if not self._send(run_id, token, message):
+                    logging.error(f"Error writing log message {message} to Port.")
+            except Exception as e:
+                logging.error(f"Error writing log message {message} to Port: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_shipper: Optional[LogShipper] = None
+_shipper_lock = threading.Lock()
+
+
+def get_log_shipper(send: Callable[[str, str, str], bool]) -> LogShipper:
+    """
+    Return the process-wide LogShipper, creating it on first use. The shipper is
+    flushed and stopped at interpreter exit, including exits caused by an exception.
+    """
+    global _shipper
+    if _shipper is None:
+        with _shipper_lock:
+            if _shipper is None:
+                _shipper = LogShipper(send)
+                atexit.register(_shipper.close)
+    return _shipper
+
+
+def flush_logs():
+    """
+    Wait for queued run logs to be delivered. A no-op if no shipper was started.
+    """
+    if _shipper is not None:
+        _shipper.flush()
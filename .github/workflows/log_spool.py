@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX runners keep drained spool files instead of pruning them
+    fcntl = None
+
+from constants import PORT_LOG_SPOOL_DIR, PORT_LOG_MAX_BATCH_CHARS
+
+_SPOOL_SUFFIX = ".jsonl"
+_OFFSET_SUFFIX = ".offset"
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _spool_paths(run_id: str, spool_dir: str) -> Tuple[str, str]:
+    name = _UNSAFE_CHARS.sub("_", run_id)
+    return (os.path.join(spool_dir, name + _SPOOL_SUFFIX),
+            os.path.join(spool_dir, name + _OFFSET_SUFFIX))
+
+
+def spool_log(run_id: str, message: str, spool_dir: str = PORT_LOG_SPOOL_DIR):
+    """
+    Append a run log message to the local spool file for run_id.
+
+    Each record is a single JSON line written with one os.write on an O_APPEND descriptor,
+    so concurrent writers never interleave partial records. Writers hold a shared lock
+    while appending so a drain never prunes a file mid-write. Tokens are never written to disk.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    spool_path, _ = _spool_paths(run_id, spool_dir)
+    record = json.dumps({"run_id": run_id, "ts": time.time(), "message": message}, ensure_ascii=False)
+    data = (record + "\n").encode("utf-8")
+    while True:
+        fd = os.open(spool_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                # A drain pruned the file between open and lock; append to a fresh one instead
+                if os.fstat(fd).st_nlink == 0:
+                    continue
+            os.write(fd, data)
+            return
+        finally:
+            os.close(fd)
+
+
+def _read_offset(offset_path: str) -> int:
+    try:
+        with open(offset_path) as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _write_offset(offset_path: str, offset: int):
+    tmp_path = offset_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(offset))
+    os.replace(tmp_path, offset_path)
+
+
+def _prune(spool_path: str, offset_path: str, offset: int):
+    """
+    Remove a spool file and its offset once every record has been shipped, unless a
+    writer appended more records since the drain read it.
+    """
+    if fcntl is None:
+        return
+    try:
+        fd = os.open(spool_path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        if os.fstat(fd).st_size != offset:
+            return
+        os.unlink(spool_path)
+        try:
+            os.unlink(offset_path)
+        except FileNotFoundError:
+            pass
+    finally:
+        os.close(fd)
+
+
+def _read_batches(spool_path: str, offset: int, max_batch_chars: int) -> Iterator[Tuple[str, List[str], int]]:
+    """
+    Yield (run_id, messages, end_offset) batches of complete records starting at offset.
+    A trailing record without a newline (still being written) is left for the next drain.
+    """
+    with open(spool_path, "rb") as f:
+        f.seek(offset)
+        run_id, messages, size, end = None, [], 0, offset
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logging.error(f"Skipping corrupt spool record in {spool_path} at offset {end}")
+                end += len(line)
+                continue
+            message = record["message"]
+            if messages and (record["run_id"] != run_id or size + len(message) + 1 > max_batch_chars):
+                yield run_id, messages, end
+                messages, size = [], 0
+            run_id = record["run_id"]
+            messages.append(message)
+            size += len(message) + 1
+            end += len(line)
+        if messages:
+            yield run_id, messages, end
+
+
+def drain_spool(send: Callable[[str, str, str], bool], token: str = "", spool_dir: str = PORT_LOG_SPOOL_DIR,
+                max_batch_chars: int = PORT_LOG_MAX_BATCH_CHARS) -> Dict[str, int]:
+    """
+    Replay spooled run logs to Port, coalescing consecutive messages into bulk requests.
+
+    Progress is checkpointed per run after every successful request, so an interrupted
+    drain resumes where it stopped. A failed request stops the drain for that run only.
+    Spool files whose records have all been shipped are removed.
+
+    Returns:
+        Mapping of run_id to the number of messages delivered in this drain
+    """
+    delivered: Dict[str, int] = {}
+    if not os.path.isdir(spool_dir):
+        logging.info(f"No log spool found at {spool_dir}")
+        return delivered
+
+    for name in sorted(os.listdir(spool_dir)):
+        if not name.endswith(_SPOOL_SUFFIX):
+            continue
+        spool_path = os.path.join(spool_dir, name)
+        offset_path = spool_path[:-len(_SPOOL_SUFFIX)] + _OFFSET_SUFFIX
+        offset = _read_offset(offset_path)
+
+        for run_id, messages, end in _read_batches(spool_path, offset, max_batch_chars):
+            if not send(run_id, token, "\n".join(messages)):
+                logging.error(f"Failed to drain spooled logs for run {run_id}; will resume from offset {offset}")
+                break
+            offset = end
+            _write_offset(offset_path, offset)
+            delivered[run_id] = delivered.get(run_id, 0) + len(messages)
+        else:
+            _prune(spool_path, offset_path, offset)
+
+    for run_id, count in delivered.items():
+        logging.info(f"Drained {count} spooled log message(s) for run {run_id}")
+    return delivered
@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from api_paths import normalize_endpoint
+from constants import PORT_METRICS_STEP_SUMMARY, PORT_METRICS_TEXTFILE
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram. With keep_samples it also keeps the raw samples
+    for percentiles; without, its memory stays constant however long it lives.
+    """
+
+    def __init__(self, keep_samples: bool = True):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.samples: Optional[List[float]] = [] if keep_samples else None
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        if self.samples is not None:
+            self.samples.append(seconds)
+        self.total += seconds
+        self.count += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def percentile(self, pct: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs in Prometheus order, ending with +Inf."""
+        running, pairs = 0, []
+        for bound, count in zip(BUCKETS, self.bucket_counts):
+            running += count
+            pairs.append((f"{bound:g}", running))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class Metrics:
+    """
+    Thread-safe collector for Port API calls and command spans.
+
+    PortClient records every request (endpoint, status, bytes, duration); ArgsParser wraps
+    each command in a span. emit() appends a markdown summary of the calls made since the
+    last emit() to GITHUB_STEP_SUMMARY and optionally writes a Prometheus textfile-collector
+    file. The Prometheus series count from process start and are never reset, so counters
+    stay monotonic across the writes of a long-lived process (the daemon).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.process_requests: Dict[Tuple[str, str], Histogram] = defaultdict(lambda: Histogram(keep_samples=False))
+        self.process_statuses: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        self.process_bytes_sent: Counter = Counter()
+        self.process_bytes_received: Counter = Counter()
+        self.last_span_seconds: Dict[str, float] = {}
+        self.reset()
+
+    def reset(self):
+        """Start a new step summary; the process-wide Prometheus series are kept."""
+        with self._lock:
+            self.requests: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+            self.statuses: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+            self.bytes_sent: Counter = Counter()
+            self.bytes_received: Counter = Counter()
+            self.spans: Dict[str, Histogram] = defaultdict(Histogram)
+
+    def record_request(self, method: str, path: str, status: Optional[int], seconds: float,
+                       bytes_sent: int = 0, bytes_received: int = 0):
+        key = (method, normalize_endpoint(path))
+        status = str(status) if status else "error"
+        with self._lock:
+            for requests, statuses, sent, received in (
+                    (self.requests, self.statuses, self.bytes_sent, self.bytes_received),
+                    (self.process_requests, self.process_statuses, self.process_bytes_sent,
+                     self.process_bytes_received)):
+                requests[key].observe(seconds)
+                statuses[key][status] += 1
+                sent[key] += bytes_sent
+                received[key] += bytes_received
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.spans[name].observe(elapsed)
+                self.last_span_seconds[name] = elapsed
+
+    def step_summary(self) -> str:
+        """Markdown tables of per-endpoint latency/status/bytes and command spans."""
+        with self._lock:
+            lines = ["### Port API calls", "",
+                     "| Endpoint | Calls | Statuses | p50 ms | p95 ms | max ms | Total ms | Sent KB | Received KB |",
+                     "|---|---:|---|---:|---:|---:|---:|---:|---:|"]
+            by_time = sorted(self.requests.items(), key=lambda item: -item[1].total)
+            for (method, endpoint), hist in by_time:
+                statuses = ", ".join(f"{s}×{n}" for s, n in sorted(self.statuses[(method, endpoint)].items()))
+                lines.append(f"| `{method} {endpoint}` | {hist.count} | {statuses} | "
+                             f"{hist.percentile(50) * 1000:.0f} | {hist.percentile(95) * 1000:.0f} | "
+                             f"{max(hist.samples) * 1000:.0f} | {hist.total * 1000:.0f} | "
+                             f"{self.bytes_sent[(method, endpoint)] / 1024:.1f} | "
+                             f"{self.bytes_received[(method, endpoint)] / 1024:.1f} |")
+            lines += ["", "Latency histogram (calls per bucket, all endpoints):", "",
+                      "| " + " | ".join(f"≤{b * 1000:g} ms" for b in BUCKETS) + " | more |",
+                      "|" + "---:|" * (len(BUCKETS) + 1)]
+            totals = [sum(h.bucket_counts[i] for h in self.requests.values()) for i in range(len(BUCKETS))]
+            overflow = sum(h.count for h in self.requests.values()) - sum(totals)
+            lines.append("| " + " | ".join(str(n) for n in totals + [overflow]) + " |")
+            if self.spans:
+                lines += ["", "| Command | Runs | Total ms |", "|---|---:|---:|"]
+                lines += [f"| `{name}` | {hist.count} | {hist.total * 1000:.0f} |" for name, hist in self.spans.items()]
+        return "\n".join(lines) + "\n\n"
+
+    def prometheus_text(self) -> str:
+        """Process-lifetime metrics in the Prometheus text exposition format."""
+        out = ["# HELP port_api_request_duration_seconds Port API request latency.",
+               "# TYPE port_api_request_duration_seconds histogram"]
+        with self._lock:
+            for (method, endpoint), hist in self.process_requests.items():
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                out += [f'port_api_request_duration_seconds_bucket{{{labels},le="{le}"}} {n}'
+                        for le, n in hist.cumulative()]
+                out.append(f"port_api_request_duration_seconds_sum{{{labels}}} {hist.total:.6f}")
+                out.append(f"port_api_request_duration_seconds_count{{{labels}}} {hist.count}")
+            out += ["# HELP port_api_requests_total Port API requests by response status.",
+                    "# TYPE port_api_requests_total counter"]
+            for (method, endpoint), statuses in self.process_statuses.items():
+                out += [f'port_api_requests_total{{method="{method}",endpoint="{endpoint}",status="{s}"}} {n}'
+                        for s, n in statuses.items()]
+            for name, counter, body in (("sent", self.process_bytes_sent, "request"),
+                                        ("received", self.process_bytes_received, "response")):
+                out += [f"# HELP port_api_bytes_{name}_total Port API {body} body bytes.",
+                        f"# TYPE port_api_bytes_{name}_total counter"]
+                out += [f'port_api_bytes_{name}_total{{method="{m}",endpoint="{e}"}} {n}'
+                        for (m, e), n in counter.items()]
+            out += ["# HELP port_command_duration_seconds Wall time of the last run of each command.",
+                    "# TYPE port_command_duration_seconds gauge"]
+            out += [f'port_command_duration_seconds{{command="{name}"}} {seconds:.6f}'
+                    for name, seconds in self.last_span_seconds.items()]
+        return "\n".join(out) + "\n"
+
+    def emit(self, summary_path: Optional[str] = None, textfile: str = PORT_METRICS_TEXTFILE):
+        """
+        Write the step summary and the Prometheus textfile (each when configured),
+        then reset the collector.
+        """
+        if summary_path is None and PORT_METRICS_STEP_SUMMARY:
+            summary_path = os.getenv("GITHUB_STEP_SUMMARY")
+        try:
+            if not self.requests and not self.spans:
+                return
+            if summary_path:
+                with open(summary_path, "a", encoding="utf-8") as f:
+                    f.write(self.step_summary())
+            if textfile:
+                # Write-then-rename so the node exporter never scrapes a partial file
+                tmp_path = f"{textfile}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(self.prometheus_text())
+                os.replace(tmp_path, textfile)
+        except OSError as e:
+            logging.warning(f"Failed to write Port API metrics: {e}")
+        finally:
+            self.reset()
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
@@ -1,23 +1,75 @@
-from datetime import datetime, timedelta
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-import pytz
+# "Indefinite" environments are kept for a year; they are written with time_bounded=false
+INDEFINITE = "Indefinite"
+INDEFINITE_DURATION = timedelta(days=365)
 
+_UNITS = {
+    "h": "hours", "hr": "hours", "hrs": "hours", "hour": "hours", "hours": "hours",
+    "d": "days", "day": "days", "days": "days",
+    "w": "weeks", "wk": "weeks", "wks": "weeks", "week": "weeks", "weeks": "weeks",
+}
+_COUNT_AND_UNIT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]+)\s*$", re.IGNORECASE)
+_ISO_DURATION = re.compile(
+    r"^P(?:(?P<weeks>\d+(?:\.\d+)?)W)?(?:(?P<days>\d+(?:\.\d+)?)D)?"
+    r"(?:T(?:(?P<hours>\d+(?:\.\d+)?)H)?(?:(?P<minutes>\d+(?:\.\d+)?)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$",
+    re.IGNORECASE)
 
-def calculate_time_delta(time_input: str) -> str:
 
-    current_time = datetime.now(pytz.UTC).replace(microsecond=0)
-
-    # Parse and add time delta
-    if time_input == "1 Day":
-        future_time = current_time + timedelta(days=1)
-    elif time_input == "2 Hours":
-        future_time = current_time + timedelta(hours=2)
-    elif time_input == "1 Week":
-        future_time = current_time + timedelta(weeks=1)
-    elif time_input == "Indefinite":
-        future_time = current_time + timedelta(days=365)
+def parse_duration(time_input: str) -> timedelta:
+    """
+    Parse a TTL such as "2 Hours", "3 days", "1 Week", "36h", an ISO-8601 duration
+    ("P1W", "P2DT12H", "PT90M") or "Indefinite".
+    Calendar units (years, months) are rejected because their length is ambiguous.
+    """
+    text = (time_input or "").strip()
+    if text == INDEFINITE:
+        return INDEFINITE_DURATION
+
+    parts = None
+    match = _COUNT_AND_UNIT.match(text)
+    if match and match.group(2).lower() in _UNITS:
+        parts = {_UNITS[match.group(2).lower()]: float(match.group(1))}
     else:
+        match = _ISO_DURATION.match(text)
+        if match and text.upper() not in ("P", "PT") and not text.upper().endswith("T"):
+            parts = {unit: float(value) for unit, value in match.groupdict().items() if value}
+    if parts is None:
         raise ValueError(f"Unsupported time input: {time_input}")
 
+    try:
+        return timedelta(**parts)
+    except OverflowError:
+        raise ValueError(f"Time input out of range: {time_input}") from None
+
+
+def is_time_bounded(time_input: str) -> bool:
+    return (time_input or "").strip() != INDEFINITE
+
+
+def calculate_time_delta(time_input: str) -> str:
+
+    current_time = datetime.now(timezone.utc).replace(microsecond=0)
+    try:
+        future_time = current_time + parse_duration(time_input)
+    except OverflowError:
+        raise ValueError(f"Time input out of range: {time_input}") from None
+
     # Convert to ISO 8601 format with milliseconds and Z for UTC
-    return future_time.isoformat().replace('+00:00', '.000Z')
\ No newline at end of file
+    return future_time.replace(microsecond=0).isoformat().replace('+00:00', '.000Z')
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    Parse an ISO-8601 timestamp as written to Port (e.g. 2025-02-04T10:53:01.000Z) into an
+    aware UTC datetime, or return None if it cannot be read.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -0,0 +1,195 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import random
+import re
+from typing import Iterable, Optional, Tuple, Union
+
+from misc_helers import parse_timestamp
+
+# Port entity identifiers: letters, digits and @_.+:\/=- only
+_IDENTIFIER = re.compile(r"^[A-Za-z0-9@_.+:\\/=-]+$")
+
+CLOUD_RESOURCE_KINDS = ("EC2", "S3")
+REGIONS = ("us-west-1", "us-east-1", "eu-central-1")
+STATUSES = ("running", "stopped", "provisioning")
+
+# Built once and shared: json.dumps would otherwise construct an encoder per call for non-default options
+_ENCODER = json.JSONEncoder(ensure_ascii=False, check_circular=False, allow_nan=False, separators=(",", ":"))
+
+
+class ModelValidationError(ValueError):
+    """An entity model failed local validation; nothing was sent to Port."""
+
+
+class EntityModel(ABC):
+    """
+    Base for the typed entity models. Subclasses declare __slots__, BLUEPRINT and
+    _payload(), and call validate() at the end of __init__, so a bad input raises
+    ModelValidationError when the model is built, before any request is made.
+    Models are not re-validated afterwards; treat them as immutable.
+    """
+
+    __slots__ = ("identifier", "title")
+    BLUEPRINT = ""
+
+    def validate(self):
+        _check_identifier("identifier", self.identifier)
+        if not isinstance(self.title, str) or not self.title:
+            raise ModelValidationError(f"{self.BLUEPRINT} {self.identifier}: title must be a non-empty string")
+
+    def to_payload(self) -> dict:
+        """The entity upsert payload."""
+        return self._payload()
+
+    @abstractmethod
+    def _payload(self) -> dict:
+        """Build the upsert payload from the model's fields."""
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in _all_slots(type(self)))
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in _all_slots(type(self)))
+
+
+class _TimeBounded(EntityModel):
+    """Shared fields and checks of the ttl-carrying blueprints (environment, cluster)."""
+
+    __slots__ = ("project", "triggered_by", "ttl", "time_bounded")
+
+    def validate(self):
+        super().validate()
+        _check_identifier("project", self.project)
+        _check_optional_str("triggered_by", self.triggered_by)
+        if parse_timestamp(self.ttl) is None:
+            raise ModelValidationError(f"{self.BLUEPRINT} {self.identifier}: ttl must be an ISO-8601 timestamp, "
+                                       f"got {self.ttl!r}")
+        if not isinstance(self.time_bounded, bool):
+            raise ModelValidationError(f"{self.BLUEPRINT} {self.identifier}: time_bounded must be a bool")
+
+    def _payload(self) -> dict:
+        return {
+            "identifier": self.identifier,
+            "title": self.title,
+            "properties": {"time_bounded": self.time_bounded, "ttl": self.ttl},
+            "relations": {"project": self.project, "triggered_by": self.triggered_by},
+        }
+
+
+class Environment(_TimeBounded):
+    __slots__ = ()
+    BLUEPRINT = "environment"
+
+    def __init__(self, identifier: str, title: str, project: str, triggered_by: Optional[str], ttl: str,
+                 time_bounded: bool = True):
+        self.identifier = identifier
+        self.title = title
+        self.project = project
+        self.triggered_by = triggered_by
+        self.ttl = ttl
+        self.time_bounded = time_bounded
+        self.validate()
+
+    @classmethod
+    def new(cls, project: str, ttl: str, triggered_by: Optional[str], time_bounded: bool = True) -> "Environment":
+        """A new environment with a random identifier. ttl is the computed expiry timestamp."""
+        env_rand = os.urandom(4).hex()
+        return cls(f"environment_{env_rand}", f"env_{env_rand}_{project}", project, triggered_by, ttl, time_bounded)
+
+
+class Cluster(_TimeBounded):
+    __slots__ = ()
+    BLUEPRINT = "cluster"
+
+    def __init__(self, identifier: str, project: str, triggered_by: Optional[str], ttl: str,
+                 time_bounded: bool = True):
+        self.identifier = identifier
+        self.title = identifier
+        self.project = project
+        self.triggered_by = triggered_by
+        self.ttl = ttl
+        self.time_bounded = time_bounded
+        self.validate()
+
+    @classmethod
+    def new(cls, name: str, project: str, ttl: str, triggered_by: Optional[str],
+            time_bounded: bool = True) -> "Cluster":
+        """A new cluster named {name}_{project}_{random suffix}."""
+        return cls(f"{name}_{project}_{os.urandom(4).hex()}", project, triggered_by, ttl, time_bounded)
+
+
+class CloudResource(EntityModel):
+    __slots__ = ("environment", "kind", "region", "tags", "link", "status")
+    BLUEPRINT = "cloudResource"
+
+    def __init__(self, identifier: str, environment: str, kind: str, region: str, status: str,
+                 owner: Optional[str] = None):
+        self.identifier = identifier
+        self.title = f"{kind} Resource"
+        self.environment = environment
+        self.kind = kind
+        self.region = region
+        self.tags = {"Owner": owner, "Environment": environment}
+        self.link = f"https://{kind}.{region}.aws.com/resource"
+        self.status = status
+        self.validate()
+
+    @classmethod
+    def new(cls, environment: str, kind: str, triggered_by: Optional[str]) -> "CloudResource":
+        """A new cloud resource of kind in a random region and state, attached to environment."""
+        return cls(f"cloudResource_{kind}_{os.urandom(4).hex()}", environment, kind,
+                   random.choice(REGIONS), random.choice(STATUSES), triggered_by)
+
+    def validate(self):
+        super().validate()
+        _check_identifier("environment", self.environment)
+        if self.kind not in CLOUD_RESOURCE_KINDS:
+            raise ModelValidationError(f"cloudResource {self.identifier}: kind must be one of "
+                                       f"{', '.join(CLOUD_RESOURCE_KINDS)}, got {self.kind!r}")
+        if self.region not in REGIONS:
+            raise ModelValidationError(f"cloudResource {self.identifier}: unknown region {self.region!r}")
+        if self.status not in STATUSES:
+            raise ModelValidationError(f"cloudResource {self.identifier}: unknown status {self.status!r}")
+        _check_optional_str("tags.Owner", self.tags.get("Owner"))
+
+    def _payload(self) -> dict:
+        return {
+            "identifier": self.identifier,
+            "title": self.title,
+            "properties": {"kind": self.kind, "region": self.region, "tags": self.tags, "link": self.link,
+                           "status": self.status},
+            "relations": {"environment": self.environment},
+        }
+
+
+def encode(entity: Union[EntityModel, dict]) -> bytes:
+    """Encode a model or payload dict as a request body with the shared encoder."""
+    return _ENCODER.encode(entity.to_payload() if isinstance(entity, EntityModel) else entity).encode()
+
+
+def encode_bulk(entities: Iterable[Union[EntityModel, dict]]) -> bytes:
+    """
+    Encode a bulk upsert body ({"entities": [...]}) from models and/or payload dicts with the
+    shared encoder, one entity at a time.
+    """
+    parts = [_ENCODER.encode(entity.to_payload() if isinstance(entity, EntityModel) else entity)
+             for entity in entities]
+    return ('{"entities":[' + ",".join(parts) + "]}").encode()
+
+
+def _check_identifier(field: str, value):
+    if not isinstance(value, str) or not _IDENTIFIER.match(value):
+        raise ModelValidationError(f"{field} must be a Port identifier (A-Z a-z 0-9 @_.+:\\/=-), "
+                                   f"got {value!r}")
+
+
+def _check_optional_str(field: str, value):
+    if value is not None and not isinstance(value, str):
+        raise ModelValidationError(f"{field} must be a string, got {type(value).__name__}")
+
+
+def _all_slots(cls) -> Tuple[str, ...]:
+    return tuple(name for klass in reversed(cls.__mro__) for name in getattr(klass, "__slots__", ()))
@@ -0,0 +1,124 @@
+"""
+Warm orchestrator daemon for self-hosted runners.
+
+`serve` keeps one interpreter alive with requests imported, the pooled PortClient
+session open and the token cache populated, and runs ArgsParser commands sent over a
+local Unix socket by port_gha_client.py. Each request is one JSON line
+{"argv": [...], "env": {...}, "cwd": "..."} answered by one JSON line
+{"exit_code": int, "stdout": str, "stderr": str}.
+
+Commands run one at a time: the step's environment is overlaid on os.environ for the
+duration of the command, so two steps must never share the process concurrently.
+Settings read from constants.py at import time (log mode, timeouts, pool size) are
+fixed by the daemon's own environment.
+"""
+import io
+import json
+import logging
+import os
+import socketserver
+import sys
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+
+from args_parser import ArgsParser
+from env_var_helper import get_run_context
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+@contextmanager
+def _step_environment(env: dict, cwd: str):
+    """Overlay a step's environment and working directory, restoring both afterwards."""
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    os.environ.update(env)
+    get_run_context().invalidate()
+    try:
+        if cwd:
+            os.chdir(cwd)
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+        get_run_context().invalidate()
+
+
+def run_command(argv: list, env: dict, cwd: str = "") -> dict:
+    """Run one orchestrator command in-process and capture its output and exit code."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    log_handler = logging.StreamHandler(stderr)
+    log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root_logger = logging.getLogger()
+    root_logger.addHandler(log_handler)
+    exit_code = 0
+    try:
+        with _step_environment(env, cwd), redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                command = ArgsParser(argv)
+                if command.args.command == "serve":
+                    print("The daemon cannot serve nested daemons.", file=sys.stderr)
+                    exit_code = 2
+                else:
+                    command.execute_command()
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        root_logger.removeHandler(log_handler)
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            response = run_command(list(request["argv"]), dict(request.get("env") or {}), request.get("cwd", ""))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"exit_code": 2, "stdout": "", "stderr": f"Invalid daemon request: {e}\n"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class OrchestratorServer(socketserver.UnixStreamServer):
+    """Single-threaded on purpose: commands mutate process-wide environment."""
+    timed_out = False
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+    def handle_timeout(self):
+        self.timed_out = True
+
+
+def serve(socket_path: str, idle_timeout: float = 0):
+    """Serve orchestrator commands on socket_path until stopped or idle for idle_timeout seconds."""
+    # Pay the import and connection-pool cost once, before the first step arrives.
+    import port  # noqa: F401
+    from port_client import get_port_client
+    get_port_client()
+
+    with OrchestratorServer(socket_path, _CommandHandler) as server:
+        logging.info(f"Orchestrator daemon listening on {socket_path}")
+        if not idle_timeout:
+            server.serve_forever()
+            return
+        server.timeout = idle_timeout
+        while not server.timed_out:
+            server.handle_request()
+        logging.info(f"Orchestrator daemon idle for {idle_timeout}s, exiting")
@@ -1,22 +1,50 @@
+import json
 import logging
-import os
-from typing import Optional
-import random
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from constants import PORT_BULK_CHUNK_SIZE, PORT_BULK_MAX_WORKERS, PORT_LOG_MODE, PORT_LOG_SPOOL_DIR
+from entity_cache import get_entity_cache
+from env_var_helper import build_port_api_headers, get_optional_port_context, get_port_context, get_run_context
+from github_output import github_output_sink
+from log_shipper import get_log_shipper
+from log_spool import drain_spool, spool_log
+from misc_helers import calculate_time_delta, is_time_bounded
+from models import CloudResource, Cluster, EntityModel, Environment, encode, encode_bulk
+from port_client import get_port_client
+from task_graph import TaskGraph
+from token_cache import get_cached_token
+from upsert_index import PATCH, SKIP, UnchangedResponse, get_upsert_index
+
+
+def send_post_request(path, headers, params, data, idempotent: bool = False):
+    """
+    Helper function to send POST requests through the shared Port client and handle errors.
+    Only idempotent POSTs (upserts, token requests) are retried after the API may have seen them.
+    """
+    response = get_port_client().post(path, headers=headers, params=params, data=data, idempotent=idempotent)
+
+    if response is None:
+        return None
 
-from constants import PORT_API_URL
-from env_var_helper import get_port_context, get_env_var
-from misc_helers import calculate_time_delta
+    if response.status_code != 200 and response.status_code != 201:
+        logging.error(f"Failed to send POST request: {response.text}:{response.status_code}")
+        return None
 
+    return response
 
-def send_post_request(url, headers, params, data):
+def send_patch_request(path, headers, params, data):
     """
-    Helper function to send POST requests and handle errors.
+    Helper function to send PATCH requests through the shared Port client and handle errors.
     """
-    response = requests.post(url, headers=headers, params=params, json=data)
+    # A PATCH sets the given fields to fixed values, so resending it is harmless
+    response = get_port_client().request("PATCH", path, headers=headers, params=params, data=data, idempotent=True)
 
-    if response.status_code != 200 and response.status_code != 201:
-        logging.error(f"Failed to send POST request: {response.text}:{response.status_code}")
+    if response is None:
+        return None
+
+    if response.status_code != 200:
+        logging.error(f"Failed to send PATCH request: {response.text}:{response.status_code}")
         return None
 
     return response
@@ -24,58 +52,129 @@ def send_post_request(url, headers, params, data):
 def get_port_token(client_id:str = "", client_secret:str = "") -> Optional[str]:
     """
     Retrieve the PORT JWT Token using the provided client credentials.
+    A cached token is reused until it is close to expiry.
     """
-    url = f"{PORT_API_URL}/auth/access_token"
+    return get_cached_token(client_id, lambda: _fetch_port_token(client_id, client_secret))
 
+def _fetch_port_token(client_id: str, client_secret: str):
     data = {"clientId": client_id, "clientSecret": client_secret}
-    response = send_post_request(url, {"Content-Type": "application/json"}, None,data)
+    response = send_post_request("/auth/access_token", {"Content-Type": "application/json"}, None, data,
+                                 idempotent=True)
     if response is None:
         logging.critical("Failed to retrieve PORT JWT Token. (empty response)")
         raise RuntimeError("Failed to retrieve PORT JWT Token.")
 
-    return response.json().get("accessToken")
+    body = response.json()
+    return body.get("accessToken"), body.get("expiresIn")
 
 def post_log(message, token="", run_id=""):
     """
     Post a log entry to Port.
+
+    In the default "async" PORT_LOG_MODE the message is queued on the background
+    log shipper and delivered in order; call flush_logs() to wait for delivery.
+    In "spool" mode it is only appended to the local spool (see drain_log_spool).
     """
-    env_var_context = get_port_context()
     if not run_id:
-        run_id = env_var_context["runId"]
-    url = f'{PORT_API_URL}/actions/runs/{run_id}/logs'
+        run_id = get_run_context().run_id
+
+    if PORT_LOG_MODE == "spool":
+        spool_log(run_id, message)
+    elif PORT_LOG_MODE == "async":
+        get_log_shipper(deliver_log).submit(run_id, message, token)
+    else:
+        deliver_log(run_id, token, message)
+
+def deliver_log(run_id, token, message) -> bool:
+    """
+    Send a run log message, spooling it to disk if Port does not accept it so that a
+    later drain_log_spool step can replay it.
+    """
+    if send_log(run_id, token, message):
+        return True
+    logging.error(f"Error writing log message {message} to Port. Spooling it for a later drain.")
+    spool_log(run_id, message)
+    return True
+
+def send_log(run_id, token, message) -> bool:
+    """
+    Synchronously send one run log message to Port.
+    """
+    path = f'/actions/runs/{run_id}/logs'
     headers = get_port_api_headers(token)
     data = {"message": message}
-    response = send_post_request(url, headers, None, data=data)
+    response = send_post_request(path, headers, None, data=data)
+    return bool(response)
 
-    if not response:
-        logging.error(f"Error writing log message {message} to Port.")
+def drain_log_spool(token: str = "", spool_dir: str = ""):
+    """
+    Replay the local run log spool to Port in bulk.
+    """
+    return drain_spool(send_log, token, spool_dir or PORT_LOG_SPOOL_DIR)
+
+def get_entity(blueprint: str, identifier: str, ttl: Optional[float] = None, client_id: str = "",
+               client_secret: str = "", output_key: str = "entity") -> dict:
+    """
+    Fetch an entity through the on-disk entity cache and write it as JSON to GITHUB_OUTPUT.
+    With client credentials a token is only requested when the cache has to hit the API.
+    """
+    def headers():
+        if client_id and client_secret:
+            return build_port_api_headers(get_port_token(client_id, client_secret))
+        return get_port_api_headers()
+
+    entity = get_entity_cache().get(blueprint, identifier, headers, ttl)
+    if output_key:
+        with github_output_sink() as outputs:
+            outputs.set(output_key, json.dumps(entity))
+    return entity
 
 def get_port_api_headers(token:str = ""):
-    if not token:
-        token = get_env_var("PORT_TOKEN")
-        if not token:
-            logging.error("PORT_TOKEN environment variable is not set or empty.")
-            return None
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
+    if token:
+        return build_port_api_headers(token)
+    headers = get_run_context().auth_headers
+    if not headers:
+        logging.error("PORT_TOKEN environment variable is not set or empty.")
+        return None
     return headers
 
-def create_entity(blueprint: str, data: dict, upsert: bool = True):
+def create_entity(blueprint: str, data: dict, upsert: bool = True, force: bool = False):
     """
     Create an entity in Port.
+
+    Upserts are checked against the upsert index first: a payload identical to the last
+    one written is not sent again, and one with only changed properties/relations/title
+    is sent as a partial PATCH. force=True always sends the full upsert, e.g. when the
+    entity may have been deleted or edited in Port since this runner last wrote it.
     """
     port_env_context = get_port_context()
     try:
-        url = f"{PORT_API_URL}/blueprints/{blueprint}/entities"
+        path = f"/blueprints/{blueprint}/entities"
         headers = get_port_api_headers()
         params = {"run_id": port_env_context["runId"], "upsert": "true"} if upsert else None
-
-        response = send_post_request(url, headers, params, data)
+        index = get_upsert_index()
+        action, partial = index.plan(blueprint, data) if upsert and not force else (None, None)
+
+        response = None
+        if action == SKIP:
+            logging.debug(f"Entity {data['identifier']} in {blueprint} is unchanged, skipping upsert")
+            response = UnchangedResponse(data)
+        elif action == PATCH:
+            response = send_patch_request(f"{path}/{data['identifier']}", headers,
+                                          {"run_id": port_env_context["runId"]}, encode(partial))
+        if response is None:
+            response = send_post_request(path, headers, params, encode(data), idempotent=upsert)
+        # A skip keeps the entry's written_at, so it still expires and forces a full rewrite
+        if response and upsert and action != SKIP:
+            index.record(blueprint, data)
+            index.save()
 
         if response:
             e_id = response.json()["entity"]["identifier"]
+            if action == SKIP:
+                post_log(f'✅ Entity {e_id} in {blueprint} blueprint is unchanged, skipped',
+                         run_id=port_env_context["runId"])
+                return response
             logging.debug(f"Successfully created entity {e_id} in {blueprint} blueprint")
             post_log(f'✅ Successfully created entity {e_id} in {blueprint} blueprint! 🥳',
                      run_id=port_env_context["runId"])
@@ -90,6 +189,91 @@ def create_entity(blueprint: str, data: dict, upsert: bool = True):
         post_log(f'❌ Error occurred while creating {blueprint}: {str(e)}', run_id=port_env_context["runId"])
         raise RuntimeError(f"Error occurred while creating {blueprint}: {str(e)}")
 
+def _payload(entity) -> dict:
+    return entity.to_payload() if isinstance(entity, EntityModel) else entity
+
+def _identifier(entity) -> Optional[str]:
+    return entity.identifier if isinstance(entity, EntityModel) else entity.get("identifier")
+
+def create_entities(blueprint: str, entities: Iterable, upsert: bool = True,
+                    chunk_size: int = PORT_BULK_CHUNK_SIZE, max_workers: int = PORT_BULK_MAX_WORKERS,
+                    force: bool = False) -> List[dict]:
+    """
+    Create many entities in Port through the bulk endpoint.
+
+    Entities are sent in chunks of chunk_size (the bulk API limit), with up to
+    max_workers chunks in flight at once. When upserting, entities whose payload is
+    identical to the one last written (see upsert_index) are not sent at all and are
+    reported as ok; changed entities are sent in full through the bulk endpoint.
+    force=True sends every entity regardless of the index.
+
+    entities may be payload dicts or models (see models.py). Models are validated when
+    built; their payloads are only built per chunk and encoded with the shared encoder.
+
+    Returns:
+        One result per input entity, in input order: {"identifier", "ok", "error"}
+    """
+    port_env_context = get_optional_port_context()
+    path = f"/blueprints/{blueprint}/entities/bulk"
+    headers = get_port_api_headers()
+    params = {"upsert": "true"} if upsert else {}
+    if port_env_context:
+        params["run_id"] = port_env_context["runId"]
+    index = get_upsert_index()
+
+    def send_chunk(chunk: list) -> List[dict]:
+        # A malformed response fails only its own chunk; the other chunks still finish
+        try:
+            return post_chunk(chunk)
+        except Exception as e:
+            logging.error(f"Bulk upsert chunk to {blueprint} failed: {e}")
+            return [{"identifier": _identifier(entity), "ok": False, "error": f"bad bulk response: {e}"}
+                    for entity in chunk]
+
+    def post_chunk(chunk: list) -> List[dict]:
+        chunk = [_payload(entity) for entity in chunk]
+        results = [{"identifier": entity.get("identifier"), "ok": False, "error": None} for entity in chunk]
+        response = get_port_client().post(path, headers=headers, params=params, data=encode_bulk(chunk),
+                                          idempotent=upsert)
+        if response is None or response.status_code not in (200, 201, 207):
+            error = "no response" if response is None else f"{response.status_code}: {response.text}"
+            for result in results:
+                result["error"] = error
+            return results
+
+        body = response.json()
+        for created in body.get("entities", []):
+            results[created["index"]]["ok"] = True
+            results[created["index"]]["identifier"] = created.get("identifier", results[created["index"]]["identifier"])
+        for failed in body.get("errors", []):
+            results[failed["index"]]["ok"] = False
+            results[failed["index"]]["error"] = failed.get("message") or failed.get("error")
+        for result in results:
+            if not result["ok"] and not result["error"]:
+                result["error"] = "missing from bulk response"
+        if upsert:
+            for entity, result in zip(chunk, results):
+                if result["ok"]:
+                    index.record(blueprint, entity)
+        return results
+
+    entities = list(entities)
+    results = [{"identifier": _identifier(entity), "ok": True, "error": None} for entity in entities]
+    pending = [position for position, entity in enumerate(entities)
+               if not upsert or force or index.plan(blueprint, _payload(entity))[0] != SKIP]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        sent = executor.map(send_chunk, ([entities[position] for position in chunk] for chunk in chunks))
+        for chunk, chunk_results in zip(chunks, sent):
+            for position, result in zip(chunk, chunk_results):
+                results[position] = result
+    index.save()
+
+    skipped = len(entities) - len(pending)
+    logging.info(f"Bulk upsert to {blueprint}: {sum(r['ok'] for r in results)}/{len(results)} succeeded"
+                 + (f" ({skipped} unchanged, not sent)" if skipped else ""))
+    return results
+
 def resize_workload():
     port_env_context = get_port_context()
 
@@ -180,23 +364,11 @@ def create_k8s_cluster(project: str = '', ttl: str = '', triggered_by: str = '')
     try:
         project = port_env_context["inputs"]["project"].get("identifier", project)
         triggered_by = port_env_context.get("triggered_by", triggered_by)
-        ttl = calculate_time_delta(port_env_context["inputs"].get("ttl", ttl))
-        cluster_name_input = port_env_context["inputs"].get("cluster_name", "")
-        cluster_rand = os.urandom(4).hex()
-        cluster_name = f"{cluster_name_input}_{project}_{cluster_rand}"
-
-        data = {
-            "identifier": f"{cluster_name}",
-            "title": cluster_name,
-            "properties": {
-                "time_bounded": ttl != "Indefinite",
-                "ttl": ttl  # Example default TTL
-            },
-            "relations": {
-                "project": project,
-                "triggered_by": triggered_by
-            }
-        }
+        ttl_input = port_env_context["inputs"].get("ttl", ttl)
+        cluster = Cluster.new(port_env_context["inputs"].get("cluster_name", ""), project,
+                              calculate_time_delta(ttl_input), triggered_by, is_time_bounded(ttl_input))
+        data = cluster.to_payload()
+        cluster_name = cluster.identifier
 
         response = create_entity("cluster", data, True)
 
@@ -275,47 +447,60 @@ def create_environment(project: str = '', ttl: str = '', triggered_by: str = '')
     try:
         project = port_env_context["inputs"]["project"].get("identifier", project)
         triggered_by = port_env_context.get("triggered_by", triggered_by)
-        ttl = calculate_time_delta(port_env_context["inputs"].get("ttl", ttl))
-        env_rand = os.urandom(4).hex()
-        env_name = f"env_{env_rand}_{project}"
-
-        data = {
-            "identifier": f"environment_{env_rand}",
-            "title": env_name,
-            "properties": {
-                "time_bounded": ttl != "Indefinite",
-                "ttl": ttl  # Example default TTL
-            },
-            "relations": {
-                "project": project,
-                "triggered_by": triggered_by
-            }
-        }
-
-        response = create_entity("environment", data, True)
+        ttl_input = port_env_context["inputs"].get("ttl", ttl)
+        data = Environment.new(project, calculate_time_delta(ttl_input), triggered_by,
+                               is_time_bounded(ttl_input)).to_payload()
 
-        if response:
-            e_id = response.json()["entity"]["identifier"]
-            logging.debug(f"Successfully created environment e_id: {e_id}")
-            post_log(f'✅ Environment ({e_id}) successfully created! 🥳 Ready to deploy 🚀',
-                     run_id=port_env_context["runId"])
-            create_environment_cloud_resources(e_id=e_id)
-        else:
-            logging.error("Environment creation failed. No valid 'identifier' in response.")
-            post_log(f'❌ Failed to create environment.', run_id=port_env_context["runId"])
+        graph = TaskGraph()
+        graph.add("environment", lambda: _create_environment_entity(data, port_env_context["runId"]))
+        add_cloud_resource_tasks(graph, port_env_context["inputs"], "environment")
+        graph.run()
 
     except Exception as e:
         logging.error(f"Error occurred while creating environment: {str(e)}")
         post_log(f'❌ Error occurred while creating environment: {str(e)}', run_id=port_env_context["runId"])
         raise RuntimeError(f"Error occurred while creating environment: {str(e)}")
 
+def _create_environment_entity(data: dict, run_id: str) -> str:
+    response = create_entity("environment", data, True)
+
+    if response:
+        e_id = response.json()["entity"]["identifier"]
+        logging.debug(f"Successfully created environment e_id: {e_id}")
+        post_log(f'✅ Environment ({e_id}) successfully created! 🥳 Ready to deploy 🚀', run_id=run_id)
+        return e_id
+
+    logging.error("Environment creation failed. No valid 'identifier' in response.")
+    post_log(f'❌ Failed to create environment.', run_id=run_id)
+    raise RuntimeError("Failed to create environment.")
+
+def cloud_resource_requests(inputs) -> List[tuple]:
+    """
+    Return (kind, count) pairs for the cloud resources requested in the action inputs.
+    requires_ec_2 / requires_s_3 enable a kind; ec_2_count / s_3_count ask for more than one.
+    """
+    wanted = []
+    for kind, flag, count_key in (("EC2", "requires_ec_2", "ec_2_count"), ("S3", "requires_s_3", "s_3_count")):
+        if inputs.get(flag, False):
+            wanted.append((kind, int(inputs.get(count_key) or 1)))
+    return wanted
+
+def add_cloud_resource_tasks(graph: TaskGraph, inputs, environment_task: str):
+    """
+    Add one task per requested cloud resource, each depending only on environment_task
+    (whose result is the environment identifier).
+    """
+    for kind, count in cloud_resource_requests(inputs):
+        for index in range(count):
+            graph.add(f"{kind}_{index}", lambda e_id, kind=kind: create_cloud_resource(e_id, kind), environment_task)
+
 def create_environment_cloud_resources(e_id: str):
     port_env_context = get_port_context()
     try:
-        if port_env_context["inputs"].get("requires_ec_2", False):
-            create_cloud_resource(e_id, "EC2")
-        if port_env_context["inputs"].get("requires_s_3", False):
-            create_cloud_resource(e_id, "S3")
+        graph = TaskGraph()
+        graph.add("environment", lambda: e_id)
+        add_cloud_resource_tasks(graph, port_env_context["inputs"], "environment")
+        graph.run()
     except Exception as e:
         logging.error(f"Error occurred while creating cloud resources: {str(e)}")
         post_log(f'❌ Error occurred while creating cloud resources: {str(e)}', run_id=port_env_context["runId"])
@@ -348,40 +533,62 @@ def create_cloud_resource(e_id:str = '', kind: str = ''):
     try:
         triggered_by = port_env_context.get("triggered_by", None)
 
-        region = random.choice(["us-west-1", "us-east-1", "eu-central-1"])
-        tags = { "Owner": triggered_by, "Environment": e_id }
-        link = f"https://{kind}.{region}.aws.com/resource"
-        status = random.choice(["running", "stopped", "provisioning"])
-
-        data = {
-            "identifier": f"cloudResource_{kind}_{os.urandom(4).hex()}",
-            "title": f"{kind} Resource",
-            "properties": {
-                "kind": kind,
-                "region": region,
-                "tags": tags,
-                "link": link,
-                "status": status
-            },
-            "relations": {
-                "environment": e_id
-            }
-        }
+        data = CloudResource.new(e_id, kind, triggered_by).to_payload()
         response = create_entity("cloudResource", data, True)
 
-        if response:
-            resource_id = response.json().get("entity", {}).get("identifier", "")
-            if resource_id:
-                logging.debug(f"Successfully created cloud resource with ID: {resource_id}")
-                post_log(f'✅ Cloud resource ({resource_id}) successfully created! 🥳',
-                         run_id=port_env_context["runId"])
-            else:
-                logging.error("Cloud resource creation failed. No valid 'identifier' in response.")
-                post_log(f'❌ Failed to create cloud resource.', run_id=port_env_context["runId"])
-        else:
-            logging.error("Cloud resource creation failed. No response received.")
-            post_log(f'❌ Failed to create cloud resource due to API error.', run_id=port_env_context["runId"])
+        if not response:
+            raise RuntimeError("No response received.")
+        resource_id = response.json().get("entity", {}).get("identifier", "")
+        if not resource_id:
+            raise RuntimeError("No valid 'identifier' in response.")
+
+        logging.debug(f"Successfully created cloud resource with ID: {resource_id}")
+        post_log(f'✅ Cloud resource ({resource_id}) successfully created! 🥳', run_id=port_env_context["runId"])
+        return resource_id
 
     except Exception as e:
         logging.error(f"Error occurred while creating cloud resource: {str(e)}")
         post_log(f'❌ Error occurred while creating cloud resource: {str(e)}', run_id=port_env_context["runId"])
+        raise RuntimeError(f"Error occurred while creating cloud resource: {str(e)}")
+
+def provision_environments(spec_path: str, max_workers: int = PORT_BULK_MAX_WORKERS,
+                           chunk_size: int = PORT_BULK_CHUNK_SIZE, force: bool = False):
+    """
+    Provision a fleet of environments (and their cloud resources) described by a JSON spec file.
+
+    The spec is an object, or a list of objects, with the keys:
+        count, project, ttl, triggered_by, requires_ec_2, requires_s_3
+    """
+    with open(spec_path) as f:
+        specs = json.load(f)
+    if isinstance(specs, dict):
+        specs = [specs]
+
+    environments, resources = [], []
+    for spec in specs:
+        ttl_input = spec.get("ttl", "1 Day")
+        ttl = calculate_time_delta(ttl_input)
+        kinds = [kind for kind, key in (("EC2", "requires_ec_2"), ("S3", "requires_s_3")) if spec.get(key, False)]
+        for _ in range(int(spec.get("count", 1))):
+            env = Environment.new(spec.get("project", ""), ttl, spec.get("triggered_by", ""),
+                                  is_time_bounded(ttl_input))
+            environments.append(env)
+            resources.extend(CloudResource.new(env.identifier, kind, spec.get("triggered_by")) for kind in kinds)
+
+    env_results = create_entities("environment", environments, True, chunk_size, max_workers, force)
+    created_envs = {result["identifier"] for result in env_results if result["ok"]}
+    resources = [resource for resource in resources if resource.environment in created_envs]
+    resource_results = create_entities("cloudResource", resources, True, chunk_size, max_workers, force)
+
+    failures = [result for result in env_results + resource_results if not result["ok"]]
+    summary = (f'Provisioned {len(created_envs)}/{len(environments)} environments and '
+               f'{len(resource_results) - sum(1 for r in resource_results if not r["ok"])}/{len(resources)} '
+               f'cloud resources')
+    logging.info(summary)
+    if get_optional_port_context():
+        post_log(f'{"❌" if failures else "✅"} {summary}')
+    for failure in failures:
+        logging.error(f'Failed to provision {failure["identifier"]}: {failure["error"]}')
+    if failures:
+        raise RuntimeError(f"{len(failures)} entities failed to provision.")
+    return env_results + resource_results
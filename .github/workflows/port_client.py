@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from constants import PORT_API_URL, PORT_CONNECT_TIMEOUT, PORT_READ_TIMEOUT, PORT_POOL_SIZE
+from metrics import get_metrics
+from rate_limit import RETRYABLE_STATUSES, THROTTLE_STATUSES, AdaptiveLimiter, RetryPolicy, TokenBucket
+from resilience import CircuitBreaker, remaining_time
+
+if TYPE_CHECKING:
+    import requests
+
+# Methods that may be resent after the server might already have acted on them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _never_processed(status: Optional[int], sent: bool, response) -> bool:
+    """Whether a failed attempt certainly did not reach the API's handlers, so resending cannot duplicate it."""
+    if status is None:
+        return not sent
+    return status == 429 or (status == 503 and response.headers.get("Retry-After") is not None)
+
+
+class PortClient:
+    """
+    Pooled, keep-alive HTTP client for the Port API.
+
+    A single requests.Session is reused for every call so the TCP+TLS handshake
+    is paid once per process instead of once per request. requests is imported when
+    the first client is created, keeping it off the import path of commands that
+    never reach the API (e.g. spooled logging).
+
+    Every request passes through a token bucket and an adaptive (AIMD) concurrency
+    limit shared by all threads, and is retried on 429/5xx/transport errors (non-idempotent
+    requests only when the API cannot have processed them). A circuit breaker fails
+    requests fast while the API is down, and the current command's deadline
+    (resilience.command_deadline) caps every timeout and retry wait.
+    """
+
+    def __init__(self, base_url: str = PORT_API_URL, connect_timeout: float = PORT_CONNECT_TIMEOUT,
+                 read_timeout: float = PORT_READ_TIMEOUT, pool_size: int = PORT_POOL_SIZE,
+                 bucket: Optional[TokenBucket] = None, limiter: Optional[AdaptiveLimiter] = None,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+        self._request_error = requests.RequestException
+        self._connect_errors = (requests.exceptions.ConnectTimeout, ConnectTimeoutError, NewConnectionError)
+        self.base_url = base_url.rstrip("/")
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.bucket = bucket or TokenBucket()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, headers=None, params=None, data=None,
+                idempotent: Optional[bool] = None) -> Optional["requests.Response"]:
+        """
+        Send a request to the Port API, retrying 429/5xx responses and transport errors.
+        Returns the last response, or None if the last attempt failed in transport, the
+        circuit is open or the command deadline has passed.
+        idempotent defaults to the method (see IDEMPOTENT_METHODS). A non-idempotent request
+        (e.g. a run log append or a plain create) is only resent when the server cannot have
+        acted on it: a connect error, a 429, or a 503 with Retry-After.
+        Every attempt is recorded in the process metrics (endpoint, status, bytes, duration).
+        data is JSON-encoded, unless it is bytes that already hold a JSON body (see models.encode and encode_bulk).
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        response = None
+        for attempt in range(self.retry.max_attempts):
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                logging.error(f"Command deadline exceeded, not sending {method} request to {path}")
+                break
+            if not self.breaker.allow():
+                logging.error(f"Port API circuit is open, not sending {method} request to {path}")
+                break
+            self.bucket.acquire()
+            with self.limiter.slot() as outcome:
+                response, sent = self._send(method, path, headers, params, data, self._timeout(remaining_time()))
+                status = response.status_code if response is not None else None
+                outcome.throttled = status is None or status in THROTTLE_STATUSES
+            if status is None or status >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if status is not None and status not in RETRYABLE_STATUSES:
+                return response
+            if not idempotent and not _never_processed(status, sent, response):
+                logging.error(f"{method} {path} {'failed' if status is None else f'returned {status}'} "
+                              f"and is not safe to resend")
+                break
+            if attempt + 1 == self.retry.max_attempts:
+                break
+            delay = self.retry.delay(attempt, response.headers.get("Retry-After") if response is not None else None)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                logging.error(f"{method} {path} cannot be retried within the command deadline")
+                break
+            logging.warning(f"{method} {path} {'failed' if status is None else f'returned {status}'}, "
+                            f"retrying in {delay:.1f}s (attempt {attempt + 2}/{self.retry.max_attempts})")
+            time.sleep(delay)
+        return response
+
+    def _timeout(self, remaining: Optional[float]) -> Tuple[float, float]:
+        """The configured (connect, read) timeouts, shortened to fit the remaining deadline."""
+        if remaining is None:
+            return self.timeout
+        remaining = max(remaining, 0.001)
+        return min(self.timeout[0], remaining), min(self.timeout[1], remaining)
+
+    def _send(self, method: str, path: str, headers, params, data,
+              timeout: Tuple[float, float]) -> Tuple[Optional["requests.Response"], bool]:
+        """
+        Send one attempt. Returns (response, sent): response is None on a transport error,
+        and sent is False only when the error happened before the request reached the server.
+        """
+        content = {"json": data}
+        if isinstance(data, bytes):
+            content = {"data": data}
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), headers=headers, params=params, **content,
+                                            timeout=timeout)
+        except self._request_error as e:
+            get_metrics().record_request(method, path, None, time.perf_counter() - start)
+            logging.error(f"Failed to send {method} request to {path}: {e}")
+            return None, not self._is_connect_error(e)
+        body = response.request.body
+        get_metrics().record_request(method, path, response.status_code, time.perf_counter() - start,
+                                     len(body) if body else 0, len(response.content))
+        return response, True
+
+    def _is_connect_error(self, error: Exception) -> bool:
+        # requests wraps urllib3's error in a MaxRetryError whose reason is the connect failure
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(error, self._connect_errors) or isinstance(reason, self._connect_errors)
+
+    def post(self, path: str, headers=None, params=None, data=None,
+             idempotent: bool = False) -> Optional["requests.Response"]:
+        return self.request("POST", path, headers=headers, params=params, data=data, idempotent=idempotent)
+
+    def get(self, path: str, headers=None, params=None) -> Optional["requests.Response"]:
+        return self.request("GET", path, headers=headers, params=params)
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[PortClient] = None
+_client_lock = threading.Lock()
+
+
+def get_port_client() -> PortClient:
+    """
+    Return the process-wide PortClient, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PortClient()
+    return _client
+
@@ -0,0 +1,67 @@
+"""
+Client shim for the warm orchestrator daemon.
+
+Takes exactly the same arguments as port_gha_orchestrator.py. When a daemon is
+listening on PORT_ORCHESTRATOR_SOCKET the command is forwarded to it together with
+the step's PORT_*/GITHUB_* environment; otherwise it runs in-process as before.
+Only the standard library is imported on the fast path.
+"""
+import json
+import os
+import socket
+import sys
+
+from constants import PORT_ORCHESTRATOR_SOCKET
+
+# ArgsParser's top-level options that take a separate value (argparse also accepts prefixes)
+GLOBAL_VALUE_OPTIONS = ("--deadline",)
+FORWARDED_ENV_PREFIXES = ("PORT_", "GITHUB_", "RUNNER_")
+
+
+def _step_env() -> dict:
+    return {k: v for k, v in os.environ.items() if k.startswith(FORWARDED_ENV_PREFIXES)}
+
+
+def command_name(argv: list):
+    """The subcommand in argv, skipping leading top-level options such as --deadline 60."""
+    args = iter(argv)
+    for arg in args:
+        if not arg.startswith("-"):
+            return arg
+        if "=" not in arg and len(arg) > 2 and any(option.startswith(arg) for option in GLOBAL_VALUE_OPTIONS):
+            next(args, None)
+    return None
+
+
+def forward(argv: list, socket_path: str):
+    """Send one command to the daemon; return its response, or None if no daemon is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        request = {"argv": argv, "env": _step_env(), "cwd": os.getcwd()}
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise RuntimeError(f"Orchestrator daemon on {socket_path} closed the connection without a response.")
+    return json.loads(line)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    response = forward(argv, PORT_ORCHESTRATOR_SOCKET) if command_name(argv) != "serve" else None
+    if response is None:
+        import port_gha_orchestrator
+        port_gha_orchestrator.main(argv)
+        return 0
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,8 @@ from args_parser import ArgsParser
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def main():
-    args_parser = ArgsParser()
+def main(argv=None):
+    args_parser = ArgsParser(argv)
     args_parser.execute_command()
 
 if __name__ == "__main__":
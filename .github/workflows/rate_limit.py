@@ -0,0 +1,133 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from constants import (PORT_RATE_LIMIT_RPS, PORT_RATE_LIMIT_BURST, PORT_MAX_CONCURRENCY, PORT_RETRY_MAX_ATTEMPTS,
+                       PORT_RETRY_BASE_DELAY, PORT_RETRY_MAX_DELAY)
+
+# Responses worth retrying; 429 and 503 also mean "slow down" to the adaptive limiter
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class TokenBucket:
+    """
+    Client-side request rate limit: `rate` tokens per second, up to `burst` saved up.
+    A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate: float = PORT_RATE_LIMIT_RPS, burst: float = PORT_RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit shared by every caller in the process.
+
+    Each request holds a slot while in flight. A throttled response halves the limit
+    (at most once per `cooldown` seconds, so one burst of 429s counts once); every
+    successful response grows it by 1/limit, i.e. about one slot per round of requests,
+    up to `maximum`.
+    """
+
+    def __init__(self, maximum: int = PORT_MAX_CONCURRENCY, minimum: int = 1, cooldown: float = 1.0):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.cooldown = cooldown
+        self.limit = float(self.maximum)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a concurrency slot for one request. Set `.throttled` on the yielded
+        outcome to report that the request was throttled.
+        """
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+        outcome = _Outcome()
+        try:
+            yield outcome
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._adjust(outcome.throttled)
+                self._cond.notify_all()
+
+    def _adjust(self, throttled: Optional[bool]):
+        if throttled is None:
+            return
+        if not throttled:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._last_decrease = now
+
+
+class _Outcome:
+    __slots__ = ("throttled",)
+
+    def __init__(self):
+        self.throttled: Optional[bool] = None
+
+
+class RetryPolicy:
+    """
+    Retries for transport errors and RETRYABLE_STATUSES with full-jitter exponential
+    backoff, honouring Retry-After when the server sends one.
+    """
+
+    def __init__(self, max_attempts: int = PORT_RETRY_MAX_ATTEMPTS, base_delay: float = PORT_RETRY_BASE_DELAY,
+                 max_delay: float = PORT_RETRY_MAX_DELAY):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait after the given (0-based) failed attempt."""
+        hinted = parse_retry_after(retry_after)
+        if hinted is not None:
+            return min(self.max_delay, hinted)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from constants import PORT_BREAKER_FAILURE_THRESHOLD, PORT_BREAKER_RESET_TIMEOUT
+
+
+class CircuitBreaker:
+    """
+    Process-wide circuit breaker for the Port API.
+
+    Closed: requests flow and consecutive failures (transport errors, 5xx) are counted.
+    After failure_threshold of them the circuit opens and requests fail fast for
+    reset_timeout seconds. Then it turns half-open and lets a single probe through:
+    success closes the circuit, failure re-opens it for another reset_timeout.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = PORT_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = PORT_BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; in half-open state only one probe is allowed."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                logging.info("Port API circuit half-open, probing for recovery")
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info("Port API circuit closed")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                logging.warning(f"Port API circuit open after {self._failures} consecutive failures, "
+                                f"failing fast for {self.reset_timeout:g}s")
+
+
+class Deadline:
+    """A point in time by which the current command must finish."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+# One command runs per process at a time (the daemon serializes them), so the deadline is
+# process-wide rather than thread-local: worker threads spawned by the command see it too.
+_deadline: Optional[Deadline] = None
+
+
+@contextmanager
+def command_deadline(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Give the enclosed command `seconds` to finish; 0 or None means no deadline."""
+    global _deadline
+    previous = _deadline
+    _deadline = Deadline(seconds) if seconds and seconds > 0 else None
+    try:
+        yield _deadline
+    finally:
+        _deadline = previous
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current command's deadline, or None without one."""
+    deadline = _deadline
+    return deadline.remaining() if deadline is not None else None
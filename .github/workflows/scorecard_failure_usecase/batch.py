@@ -0,0 +1,131 @@
+"""Process a stream of scorecard failures (NDJSON) in a single process.
+
+Each input line is a JSON object:
+    {"rule_id": "...", "entity_id": "...", "entity": <raw entity JSON string or object>,
+     "rule": <optional raw rule entity JSON string or object>}
+
+Rules without an inline "rule" are fetched once per rule_id through the on-disk entity cache
+(PORT_TOKEN must be set for cache misses). Each output line is either
+    {"rule_id", "entity_id", "title", "properties", "relations"}
+or
+    {"rule_id", "entity_id", "error"}
+
+Usage:
+    python batch.py [--input failures.ndjson] [--output tasks.ndjson]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional
+
+# Add scorecard_failure_usecase (and the Port helpers one level up) to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+from pipeline import ParsedEntity, build_task, extract_rule
+
+
+class RuleCache:
+    """
+    Rule properties keyed by rule_id, extracted and validated once per rule.
+    A rule whose lookup raised is not fetched again: later records get the same error.
+    """
+
+    def __init__(self):
+        self._rules: Dict[str, Dict[str, Any]] = {}
+        self._errors: Dict[str, BaseException] = {}
+
+    def get(self, rule_id: str, inline_rule: Any = None) -> Dict[str, Any]:
+        rule = self._rules.get(rule_id)
+        if rule is None:
+            error = self._errors.get(rule_id)
+            if error is not None:
+                raise error
+            try:
+                rule = extract_rule(inline_rule if inline_rule is not None else fetch_rule_entity(rule_id))
+            except (SystemExit, Exception) as e:
+                self._errors[rule_id] = e
+                raise
+            self._rules[rule_id] = rule
+        return rule
+
+
+def fetch_rule_entity(rule_id: str) -> dict:
+    """
+    Fetch a `_rule` entity through the on-disk entity cache (rules rarely change).
+    """
+    from entity_cache import get_entity_cache
+
+    return get_entity_cache().get("_rule", rule_id)
+
+
+def process_failure(record: Dict[str, Any], rules: RuleCache) -> Dict[str, Any]:
+    """
+    Build the scorecard task for one failure record.
+    """
+    rule_id = record.get('rule_id', '')
+    entity_id = record.get('entity_id', '')
+    result = {'rule_id': rule_id, 'entity_id': entity_id}
+
+    rule = rules.get(rule_id, record.get('rule'))
+    if rule['error']:
+        result['error'] = rule['error']
+        return result
+
+    task = build_task(rule, ParsedEntity(record.get('entity'), entity_id), rule_id, entity_id)
+    result['title'] = task['title']
+    result['properties'] = task['properties']
+    result['relations'] = task['relations']
+    return result
+
+
+def process_stream(lines: Iterator[str], output: IO[str], rules: Optional[RuleCache] = None) -> Dict[str, int]:
+    """
+    Process failures line by line, writing one task (or error) per line as it goes.
+
+    Returns:
+        Counts of processed and failed records
+    """
+    rules = rules or RuleCache()
+    counts = {'processed': 0, 'failed': 0}
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            result = process_failure(json.loads(line), rules)
+        except (SystemExit, Exception) as e:
+            result = {'line': line_number, 'error': f"{type(e).__name__}: {e}"}
+        counts['processed'] += 1
+        if 'error' in result:
+            counts['failed'] += 1
+            print(f"✗ Line {line_number}: {result['error']}", file=sys.stderr)
+        output.write(json.dumps(result) + '\n')
+    output.flush()
+    return counts
+
+
+def main(argv=None):
+    """Main entry point for batch processing."""
+    parser = argparse.ArgumentParser(description="Process scorecard failures from an NDJSON stream")
+    parser.add_argument('--input', default='-', help="NDJSON failures file ('-' for stdin)")
+    parser.add_argument('--output', default='-', help="NDJSON tasks file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        counts = process_stream(source, sink)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(f"Processed {counts['processed']} failure(s), {counts['failed']} failed", file=sys.stderr)
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,11 @@ import os
 import sys
 from pathlib import Path
 
-# Add scorecard_failure_usecase to path
+# Add scorecard_failure_usecase (and the shared workflow helpers one level up) to path
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
 
-from json_utils import parse_json_with_repair
+from github_output import github_output_sink
 
 
 def extract_team_identifier(team_value: str) -> str:
@@ -46,18 +47,9 @@ def extract_entity_title_for_task(entity_json_raw: str, fallback_id: str) -> str
     Returns:
         Entity title or identifier
     """
-    if not entity_json_raw or entity_json_raw == "null":
-        print(f"Entity JSON is empty or null, using fallback: {fallback_id}", file=sys.stderr)
-        return fallback_id
-    
-    try:
-        entity = parse_json_with_repair(entity_json_raw, "Create task - entity parsing")
-        entity_title = entity.get('title') or entity.get('identifier', fallback_id)
-        print(f"✓ Entity title extracted: {entity_title}", file=sys.stderr)
-        return entity_title
-    except SystemExit:
-        print(f"✗ Entity parsing failed, falling back to: {fallback_id}", file=sys.stderr)
-        return fallback_id
+    from pipeline import ParsedEntity
+
+    return ParsedEntity(entity_json_raw, fallback_id).title
 
 
 def create_task_title(rule_title: str, rule_identifier: str, entity_title: str) -> str:
@@ -76,6 +68,19 @@ def create_task_title(rule_title: str, rule_identifier: str, entity_title: str)
     return f"Task: {rule_display} - {entity_title}"
 
 
+def build_properties(resolution_content: str) -> dict:
+    """
+    Build the properties object for the task entity.
+    
+    Args:
+        resolution_content: Generated resolution markdown content
+        
+    Returns:
+        Properties dictionary
+    """
+    return {'resolution': resolution_content}
+
+
 def create_properties_json(resolution_content: str) -> str:
     """
     Create properties JSON for the task entity.
@@ -86,13 +91,12 @@ def create_properties_json(resolution_content: str) -> str:
     Returns:
         JSON string with properties
     """
-    properties = {'resolution': resolution_content}
-    return json.dumps(properties)
+    return json.dumps(build_properties(resolution_content))
 
 
-def create_relations_json(rule_id: str, entity_id: str, team_id: str) -> str:
+def build_relations(rule_id: str, entity_id: str, team_id: str) -> dict:
     """
-    Create relations JSON for the task entity.
+    Build the relations object for the task entity.
     
     Args:
         rule_id: Rule entity identifier
@@ -100,7 +104,7 @@ def create_relations_json(rule_id: str, entity_id: str, team_id: str) -> str:
         team_id: Team identifier (optional)
         
     Returns:
-        JSON string with relations
+        Relations dictionary
     """
     relations = {
         'rule': rule_id,
@@ -110,7 +114,22 @@ def create_relations_json(rule_id: str, entity_id: str, team_id: str) -> str:
     if team_id and team_id != "null":
         relations['team'] = team_id
     
-    return json.dumps(relations)
+    return relations
+
+
+def create_relations_json(rule_id: str, entity_id: str, team_id: str) -> str:
+    """
+    Create relations JSON for the task entity.
+    
+    Args:
+        rule_id: Rule entity identifier
+        entity_id: Entity identifier (s3)
+        team_id: Team identifier (optional)
+        
+    Returns:
+        JSON string with relations
+    """
+    return json.dumps(build_relations(rule_id, entity_id, team_id))
 
 
 def main():
@@ -142,13 +161,11 @@ def main():
     print(f"  Properties: {properties_json}")
     print(f"  Relations: {relations_json}")
     
-    # Write outputs using multiline format
-    output_file = os.environ.get('GITHUB_OUTPUT', '/dev/stdout')
-    
-    with open(output_file, 'a') as f:
-        f.write(f"task_title={task_title}\n")
-        f.write(f"properties<<EOF\n{properties_json}\nEOF\n")
-        f.write(f"relations<<EOF\n{relations_json}\nEOF\n")
+    # Write outputs with a single buffered write
+    with github_output_sink() as outputs:
+        outputs.set('task_title', task_title)
+        outputs.set('properties', properties_json)
+        outputs.set('relations', relations_json)
 
 
 if __name__ == '__main__':
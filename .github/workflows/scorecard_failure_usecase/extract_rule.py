@@ -1,37 +1,45 @@
 """Extract and validate rule properties from Port entity JSON."""
 
+import json
 import os
 import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Tuple, Union
 
-# Add scorecard_failure_usecase to path
+# Add scorecard_failure_usecase (and the shared workflow helpers one level up) to path
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
 
-from json_utils import parse_json_with_repair, write_github_output
+from json_stream import extract_fields_with_repair, select_fields
+from github_output import github_output_sink
 
+# The only rule entity fields this step reads
+RULE_FIELDS = ('title', 'identifier', 'team', 'properties.description', 'properties.template')
 
-def extract_rule_properties(entity_json_raw: str) -> dict:
+
+def extract_rule_properties(entity_json_raw: Union[str, dict]) -> dict:
     """
     Extract rule properties from entity JSON and validate required fields.
     
     Args:
-        entity_json_raw: Raw JSON string from Port GitHub Action
+        entity_json_raw: Raw JSON string from Port GitHub Action, or the already-decoded entity
         
     Returns:
         Dictionary with extracted properties and validation status
     """
-    entity = parse_json_with_repair(entity_json_raw, "Extract rule properties")
+    if isinstance(entity_json_raw, dict):
+        fields = select_fields(entity_json_raw, RULE_FIELDS)
+    else:
+        fields = extract_fields_with_repair(entity_json_raw, RULE_FIELDS, "Extract rule properties")
     
     print("Extracting properties from parsed entity...", file=sys.stderr)
-    properties = entity.get('properties', {})
     
     result = {
-        'rule_description': properties.get('description', ''),
-        'rule_template': properties.get('template', ''),
-        'rule_team': entity.get('team', ''),
-        'rule_title': entity.get('title') or entity.get('identifier', ''),
-        'rule_identifier': entity.get('identifier', ''),
+        'rule_description': fields.get('properties.description', ''),
+        'rule_template': fields.get('properties.template', ''),
+        'rule_team': fields.get('team', ''),
+        'rule_title': fields.get('title') or fields.get('identifier', ''),
+        'rule_identifier': fields.get('identifier', ''),
     }
     
     print(f"Extracted values:", file=sys.stderr)
@@ -44,6 +52,14 @@ def extract_rule_properties(entity_json_raw: str) -> dict:
     return result
 
 
+def team_output(team: Any) -> str:
+    """
+    The rule team as a step output: strings as-is, anything else (e.g. a list of team
+    identifiers) as JSON, which create_task.extract_team_identifier can read back.
+    """
+    return team if isinstance(team, str) else json.dumps(team)
+
+
 def validate_rule_properties(properties: dict) -> Tuple[bool, str]:
     """
     Validate that required rule properties are present.
@@ -81,22 +97,23 @@ def main():
     properties = extract_rule_properties(entity_json_raw)
     validation_failed, error_message = validate_rule_properties(properties)
     
-    output_file = os.environ.get('GITHUB_OUTPUT', '/dev/stdout')
-    
-    # Write validation status
-    write_github_output('VALIDATION_FAILED', str(validation_failed).lower(), output_file)
+    with github_output_sink() as outputs:
+        # Write validation status
+        outputs.set('VALIDATION_FAILED', str(validation_failed).lower())
+        
+        if validation_failed:
+            outputs.set('ERROR_MESSAGE', error_message)
+        else:
+            # Write extracted properties
+            outputs.set('description', properties['rule_description'])
+            outputs.set('template', properties['rule_template'])
+            outputs.set('team', team_output(properties['rule_team']))
+            outputs.set('title', properties['rule_title'])
+            outputs.set('identifier', properties['rule_identifier'])
     
     if validation_failed:
-        write_github_output('ERROR_MESSAGE', error_message, output_file)
         sys.exit(0)
     
-    # Write extracted properties
-    write_github_output('description', properties['rule_description'], output_file)
-    write_github_output('template', properties['rule_template'], output_file)
-    write_github_output('team', str(properties['rule_team']), output_file)
-    write_github_output('title', properties['rule_title'], output_file)
-    write_github_output('identifier', properties['rule_identifier'], output_file)
-    
     # Print summary
     print(f"Rule Description: {properties['rule_description']}")
     print(f"Rule Template: {properties['rule_template']}")
@@ -3,11 +3,14 @@
 import os
 import sys
 from pathlib import Path
+from typing import Mapping, Optional
 
-# Add scorecard_failure_usecase to path
+# Add scorecard_failure_usecase (and the shared workflow helpers one level up) to path
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
 
-from json_utils import parse_json_with_repair, write_github_output
+from json_utils import write_github_output
+from template_engine import render_template
 
 
 def extract_entity_title(entity_json_raw: str, fallback_id: str = '') -> str:
@@ -21,24 +24,17 @@ def extract_entity_title(entity_json_raw: str, fallback_id: str = '') -> str:
     Returns:
         Entity title or identifier
     """
-    if not entity_json_raw or entity_json_raw == "null":
-        return fallback_id
-    
-    try:
-        entity = parse_json_with_repair(entity_json_raw, "Generate template - entity parsing")
-        entity_title = entity.get('title') or entity.get('identifier', fallback_id)
-        print(f"Extracted entity title: {entity_title}", file=sys.stderr)
-        return entity_title
-    except SystemExit:
-        print(f"Falling back to entity_id: {fallback_id}", file=sys.stderr)
-        return fallback_id
+    from pipeline import ParsedEntity
+
+    return ParsedEntity(entity_json_raw, fallback_id).title
 
 
 def generate_template_content(
     template: str,
     rule_name: str,
     entity_name: str,
-    description: str
+    description: str,
+    variables: Optional[Mapping[str, str]] = None
 ) -> str:
     """
     Generate template content by replacing placeholders.
@@ -48,14 +44,14 @@ def generate_template_content(
         rule_name: Rule name to replace {{ Rule }}
         entity_name: Entity name to replace {{ s3 }}
         description: Description to replace {{ Description }}
+        variables: Values for any other {{ Name }} placeholders
         
     Returns:
         Generated content with placeholders replaced
     """
-    result = template.replace('{{ Rule }}', rule_name)
-    result = result.replace('{{ s3 }}', entity_name)
-    result = result.replace('{{ Description }}', description)
-    return result
+    values = dict(variables) if variables else {}
+    values.update({'Rule': rule_name, 's3': entity_name, 'Description': description})
+    return render_template(template, values)
 
 
 def main():
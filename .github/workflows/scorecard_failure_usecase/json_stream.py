@@ -0,0 +1,198 @@
+"""Streaming extraction of selected fields from large entity JSON documents."""
+
+import json
+import re
+import sys
+from typing import Any, Dict, Iterable, Tuple
+
+from json_utils import parse_json_with_repair, repair_json
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# A string literal; raw control characters are tolerated and repaired when decoded
+_STRING = re.compile(r'"((?:[^"\\]++|\\.)*+)"', re.DOTALL)
+# Everything inside a container up to the next bracket, skipping whole string literals
+_CONTAINER_CONTENT = re.compile(r'(?:[^"\[\]{}]++|"(?:[^"\\]++|\\.)*+")*+', re.DOTALL)
+_SCALAR = re.compile(r'[^,:\[\]{}\s]*+')
+
+# Marks a requested path in the path tree
+_LEAF = object()
+
+
+class _AllFound(Exception):
+    pass
+
+
+def _build_tree(paths: Iterable[str]) -> Tuple[Dict[str, Any], int]:
+    tree: Dict[str, Any] = {}
+    count = 0
+    for path in paths:
+        node = tree
+        keys = path.split('.')
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Path {path} is nested under another requested path")
+        if keys[-1] not in node:
+            count += 1
+        node[keys[-1]] = _LEAF
+    return tree, count
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """Return the position just after the JSON value starting at pos, without decoding it."""
+    char = text[pos:pos + 1]
+    if char == '"':
+        match = _STRING.match(text, pos)
+        if match is None:
+            raise ValueError(f"Unterminated string at position {pos}")
+        return match.end()
+    if char in ('{', '['):
+        depth = 0
+        while True:
+            char = text[pos:pos + 1]
+            if char in ('{', '['):
+                depth += 1
+            elif char in ('}', ']'):
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            elif not char:
+                raise ValueError("Unterminated object or array")
+            pos = _CONTAINER_CONTENT.match(text, pos + 1).end()
+    end = _SCALAR.match(text, pos).end()
+    if end == pos:
+        raise ValueError(f"Expected a value at position {pos}")
+    return end
+
+
+def _decode(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(text)[0])
+
+
+def _decode_key(body: str) -> str:
+    return _decode(f'"{body}"') if '\\' in body or '\n' in body or '\t' in body or '\r' in body else body
+
+
+def _walk_object(text: str, pos: int, tree: Dict[str, Any], prefix: str, found: Dict[str, Any],
+                 remaining: list) -> int:
+    if text[pos:pos + 1] != '{':
+        raise ValueError(f"Expected an object at position {pos}")
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos:pos + 1] == '}':
+        return pos + 1
+
+    while True:
+        match = _STRING.match(text, pos)
+        if match is None:
+            raise ValueError(f"Expected a key at position {pos}")
+        key = _decode_key(match.group(1))
+        pos = _skip_whitespace(text, match.end())
+        if text[pos:pos + 1] != ':':
+            raise ValueError(f"Expected ':' at position {pos}")
+        pos = _skip_whitespace(text, pos + 1)
+
+        node = tree.get(key)
+        if node is _LEAF:
+            end = _skip_value(text, pos)
+            path = prefix + key
+            if path not in found:
+                found[path] = _decode(text[pos:end])
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    raise _AllFound
+            pos = end
+        elif node is not None and text[pos:pos + 1] == '{':
+            pos = _walk_object(text, pos, node, f"{prefix}{key}.", found, remaining)
+        else:
+            pos = _skip_value(text, pos)
+
+        pos = _skip_whitespace(text, pos)
+        char = text[pos:pos + 1]
+        if char == '}':
+            return pos + 1
+        if char != ',':
+            raise ValueError(f"Expected ',' or '}}' at position {pos}")
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def extract_fields(json_str: str, paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    Extract selected fields from a JSON object without materialising the rest of it.
+
+    Unrequested values are skipped at the regex level and only the requested values are
+    decoded (with control-character repair). Scanning stops as soon as every path has
+    been found. If a key appears twice, the first occurrence wins.
+
+    Args:
+        json_str: JSON text whose top-level value is an object
+        paths: Dotted key paths, e.g. "properties.description"
+
+    Returns:
+        Mapping of each path that was found to its decoded value
+
+    Raises:
+        ValueError: If the document is not a well-formed JSON object
+    """
+    tree, count = _build_tree(paths)
+    found: Dict[str, Any] = {}
+    if count == 0:
+        return found
+    try:
+        _walk_object(json_str, _skip_whitespace(json_str, 0), tree, "", found, [count])
+    except _AllFound:
+        pass
+    except IndexError as e:
+        raise ValueError(f"Malformed JSON: {e}")
+    return found
+
+
+def _lookup(entity: Any, path: str) -> Tuple[bool, Any]:
+    for key in path.split('.'):
+        if not isinstance(entity, dict) or key not in entity:
+            return False, None
+        entity = entity[key]
+    return True, entity
+
+
+def select_fields(entity: Any, paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    The extract_fields result for an already-decoded object: each dotted path present
+    in entity mapped to its value.
+    """
+    found = {}
+    for path in paths:
+        present, value = _lookup(entity, path)
+        if present:
+            found[path] = value
+    return found
+
+
+def extract_fields_with_repair(json_str: str, paths: Iterable[str], step_name: str = "Unknown") -> Dict[str, Any]:
+    """
+    Extract selected fields, falling back to a full parse_json_with_repair if the
+    streaming scan cannot read the document.
+
+    Raises:
+        SystemExit: If the JSON is empty/null or cannot be parsed even after repair
+    """
+    paths = list(paths)
+    if not json_str or json_str.strip() == "null":
+        print(f"Error: {step_name} - JSON string is empty or null", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Step: {step_name} - Streaming extraction of {len(paths)} field(s) "
+          f"from {len(json_str)} characters", file=sys.stderr)
+    try:
+        return extract_fields(json_str, paths)
+    except ValueError as e:
+        print(f"✗ Streaming extraction failed ({e}), falling back to full parse", file=sys.stderr)
+
+    return select_fields(parse_json_with_repair(json_str, step_name), paths)
+
@@ -1,59 +1,83 @@
 """JSON parsing utilities for GitHub Actions workflow."""
 
 import json
+import re
 import sys
 from typing import Dict, Any, Tuple, Optional
 
 
-def repair_json(json_str: str) -> Tuple[str, int]:
+# Control characters that must be escaped inside JSON string literals
+_CONTROL_ESCAPES = str.maketrans({'\n': '\\n', '\r': '\\r', '\t': '\\t'})
+_CONTROL_CHARS = re.compile(r'[\n\r\t]')
+
+# Skips (in C) everything outside strings plus every string literal that needs no repair,
+# then captures the body of the next string literal that contains a raw control character
+# (group 1 is None once no such literal is left). The match always succeeds where the
+# previous one ended, so scanning never restarts in the middle of a literal.
+# Possessive quantifiers (Python 3.11+) keep the scan linear with no backtracking state.
+_DIRTY_STRING = re.compile(
+    r'(?:[^"\\]++|\\.|"(?:[^"\\\n\r\t]++|\\.)*+")*+(?:"((?:[^"\\]++|\\.)*+)"?)?', re.DOTALL)
+
+# Remainder of a string literal body from a position inside it
+_STRING_BODY = re.compile(r'((?:[^"\\]++|\\.)*+)"?', re.DOTALL)
+
+# Escape sequences (kept as-is) or raw control characters, for bodies where a backslash
+# precedes a control character
+_BACKSLASH_CONTROL = re.compile(r'\\[\n\r\t]')
+_ESCAPE_OR_CONTROL = re.compile(r'\\.|[\n\r\t]', re.DOTALL)
+
+
+def _escape_control_chars(body: str) -> str:
+    if _BACKSLASH_CONTROL.search(body) is None:
+        # Chained str.replace runs in C per pattern and is much faster than str.translate
+        return body.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
+    # A control character right after a backslash is already part of an escape sequence
+    return _ESCAPE_OR_CONTROL.sub(lambda m: m.group().translate(_CONTROL_ESCAPES) if len(m.group()) == 1
+                                  else m.group(), body)
+
+
+def repair_json(json_str: str, start: int = 0) -> Tuple[str, int]:
     """
     Repair JSON string by escaping control characters within string values.
-    
+
+    Only string literals that contain a raw newline, carriage return or tab are
+    rebuilt; everything else is copied as whole spans.
+
     Args:
         json_str: Raw JSON string that may contain unescaped control characters
-        
+        start: Position inside the first string literal that needs repair, e.g. the
+            JSONDecodeError.pos of an "Invalid control character" error. Text before
+            it is assumed to need no repair and is not rescanned.
+
     Returns:
         Tuple of (repaired_json_string, number_of_characters_fixed)
     """
-    result = []
+    if _CONTROL_CHARS.search(json_str, start) is None:
+        return json_str, 0
+
+    parts = []
     chars_fixed = 0
-    in_string = False
-    escape_next = False
-    
-    for char in json_str:
-        if escape_next:
-            result.append(char)
-            escape_next = False
-            continue
-            
-        if char == '\\':
-            result.append(char)
-            escape_next = True
-            continue
-            
-        if char == '"' and not escape_next:
-            in_string = not in_string
-            result.append(char)
-            continue
-            
-        if not in_string:
-            result.append(char)
-            continue
-        
-        # Handle control characters within strings
-        control_chars = {
-            '\n': '\\n',
-            '\r': '\\r',
-            '\t': '\\t'
-        }
-        
-        if char in control_chars:
-            result.append(control_chars[char])
-            chars_fixed += 1
-        else:
-            result.append(char)
-    
-    return ''.join(result), chars_fixed
+    last = 0
+
+    def fix(match):
+        nonlocal chars_fixed, last
+        body_start, body_end = match.span(1)
+        body = match.group(1)
+        fixed_body = _escape_control_chars(body)
+        chars_fixed += len(fixed_body) - len(body)
+        parts.append(json_str[last:body_start])
+        parts.append(fixed_body)
+        last = body_end
+        return match.end()
+
+    pos = fix(_STRING_BODY.match(json_str, start)) if start else 0
+    for match in _DIRTY_STRING.finditer(json_str, pos):
+        if match.group(1) is None:
+            break
+        fix(match)
+
+    parts.append(json_str[last:])
+    return ''.join(parts), chars_fixed
 
 
 def parse_json_with_repair(json_str: str, step_name: str = "Unknown") -> Dict[str, Any]:
@@ -88,10 +112,13 @@ def parse_json_with_repair(json_str: str, step_name: str = "Unknown") -> Dict[st
         print(f"✗ Initial JSON parse failed: {initial_error}", file=sys.stderr)
         error_pos = getattr(initial_error, 'pos', 'unknown')
         print(f"Error at position: {error_pos}", file=sys.stderr)
+        # The decoder stops at the first raw control character inside a string, so
+        # everything before that position is already valid and can be skipped.
+        repair_start = initial_error.pos if initial_error.msg.startswith("Invalid control character") else 0
     
     # Attempt repair
     print("Attempting JSON repair (escaping control characters)...", file=sys.stderr)
-    fixed_json, chars_fixed = repair_json(json_str)
+    fixed_json, chars_fixed = repair_json(json_str, repair_start)
     print(f"JSON repair complete: fixed {chars_fixed} control characters", file=sys.stderr)
     print(f"Fixed JSON preview (first 200 chars): {fixed_json[:200]}", file=sys.stderr)
     
@@ -115,14 +142,15 @@ def write_github_output(key: str, value: str, output_file: str) -> None:
     """
     Write GitHub Actions output, using multiline format if value contains newlines.
     
+    Writing several outputs? Use github_output.OutputSink directly so they are
+    flushed with a single write.
+    
     Args:
         key: Output key name
         value: Output value
         output_file: Path to GitHub Actions output file
     """
-    with open(output_file, 'a') as f:
-        if '\n' in value:
-            f.write(f"{key}<<EOF\n{value}\nEOF\n")
-        else:
-            f.write(f"{key}={value}\n")
+    from github_output import OutputSink
 
+    with OutputSink(output_file) as sink:
+        sink.set(key, value)
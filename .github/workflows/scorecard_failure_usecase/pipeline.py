@@ -0,0 +1,149 @@
+"""Single-process scorecard pipeline: extract -> validate -> render -> build task.
+
+The rule and the failing entity are each parsed once and shared between steps in
+memory; extract_rule.py, generate_template.py and create_task.py remain as
+per-step entry points for compatibility.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Add scorecard_failure_usecase (and the shared workflow helpers one level up) to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+from create_task import build_properties, build_relations, create_task_title, extract_team_identifier
+from extract_rule import extract_rule_properties, team_output, validate_rule_properties
+from generate_template import generate_template_content
+from github_output import github_output_sink
+from json_stream import extract_fields_with_repair
+
+# The only fields of the failing entity the pipeline reads
+ENTITY_FIELDS = ('title', 'identifier')
+
+
+class ParsedEntity:
+    """
+    A failing entity, parsed (and repaired) at most once and shared by every step.
+    """
+
+    __slots__ = ('raw', 'fallback_id', '_fields')
+
+    def __init__(self, raw: Any, fallback_id: str = ''):
+        self.raw = raw
+        self.fallback_id = fallback_id
+        self._fields: Optional[Dict[str, Any]] = None
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        if self._fields is None:
+            self._fields = self._extract()
+        return self._fields
+
+    @property
+    def title(self) -> str:
+        return self.fields.get('title') or self.fields.get('identifier', self.fallback_id)
+
+    def _extract(self) -> Dict[str, Any]:
+        if isinstance(self.raw, dict):
+            return {key: self.raw[key] for key in ENTITY_FIELDS if key in self.raw}
+        if not self.raw or self.raw == "null":
+            print(f"Entity JSON is empty or null, using fallback: {self.fallback_id}", file=sys.stderr)
+            return {}
+        try:
+            fields = extract_fields_with_repair(self.raw, ENTITY_FIELDS, "Entity parsing")
+        except SystemExit:
+            print(f"✗ Entity parsing failed, falling back to: {self.fallback_id}", file=sys.stderr)
+            return {}
+        print(f"✓ Entity title extracted: {fields.get('title') or fields.get('identifier', self.fallback_id)}",
+              file=sys.stderr)
+        return fields
+
+
+def extract_rule(rule_entity: Any) -> Dict[str, Any]:
+    """
+    Extract and validate rule properties. The result carries an 'error' key that is
+    None when validation passed.
+    """
+    rule = extract_rule_properties(rule_entity)
+    validation_failed, error_message = validate_rule_properties(rule)
+    rule['error'] = error_message if validation_failed else None
+    return rule
+
+
+def build_task(rule: Dict[str, Any], entity: ParsedEntity, rule_id: str, entity_id: str) -> Dict[str, Any]:
+    """
+    Render the resolution and build the task entity from an extracted, valid rule.
+    """
+    entity_title = entity.title
+    rule_display_name = rule['rule_title'] or rule['rule_identifier']
+    content = generate_template_content(rule['rule_template'], rule_display_name, entity_title,
+                                        rule['rule_description'])
+    team_identifier = extract_team_identifier(team_output(rule['rule_team']))
+    return {
+        'content': content,
+        'title': create_task_title(rule['rule_title'], rule['rule_identifier'], entity_title),
+        'properties': build_properties(content),
+        'relations': build_relations(rule_id, entity_id, team_identifier),
+    }
+
+
+def run_pipeline(rule_entity: Any, entity_raw: Any, rule_id: str, entity_id: str) -> Dict[str, Any]:
+    """
+    Run every step in memory for one failing entity.
+
+    Returns:
+        Dictionary with 'rule' (extracted properties and 'error') and, when the rule
+        is valid, 'task' (content, title, properties, relations)
+    """
+    rule = extract_rule(rule_entity)
+    if rule['error']:
+        return {'rule': rule, 'task': None}
+    return {'rule': rule, 'task': build_task(rule, ParsedEntity(entity_raw, entity_id), rule_id, entity_id)}
+
+
+def main():
+    """Main entry point for the fused scorecard pipeline."""
+    rule_entity_raw = os.environ.get('RULE_ENTITY_JSON', '')
+    entity_json_raw = os.environ.get('ENTITY_JSON', '')
+    rule_id = os.environ.get('RULE_ID', '')
+    entity_id = os.environ.get('ENTITY_ID', '')
+
+    if not rule_entity_raw:
+        print("Error: RULE_ENTITY_JSON environment variable not set", file=sys.stderr)
+        sys.exit(1)
+
+    result = run_pipeline(rule_entity_raw, entity_json_raw, rule_id, entity_id)
+    rule, task = result['rule'], result['task']
+
+    with github_output_sink() as outputs:
+        outputs.set('VALIDATION_FAILED', str(task is None).lower())
+        if task is None:
+            outputs.set('ERROR_MESSAGE', rule['error'])
+        else:
+            outputs.set('description', rule['rule_description'])
+            outputs.set('template', rule['rule_template'])
+            outputs.set('team', team_output(rule['rule_team']))
+            outputs.set('title', rule['rule_title'])
+            outputs.set('identifier', rule['rule_identifier'])
+            outputs.set('content', task['content'])
+            outputs.set('task_title', task['title'])
+            outputs.set('properties', json.dumps(task['properties']))
+            outputs.set('relations', json.dumps(task['relations']))
+
+    if task is None:
+        sys.exit(0)
+
+    print("Creating scorecard task entity:")
+    print(f"  Title: {task['title']}")
+    print(f"  Rule: {rule_id}")
+    print(f"  Entity: {entity_id}")
+    print(f"  Properties: {json.dumps(task['properties'])}")
+    print(f"  Relations: {json.dumps(task['relations'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compiled, cached rendering of scorecard resolution templates."""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Mapping, Optional, Tuple
+
+# {{ Name }} placeholders; surrounding whitespace inside the braces is optional
+_PLACEHOLDER = re.compile(r'\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}')
+
+TEMPLATE_CACHE_SIZE = 256
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal segments and named slots.
+
+    Rendering fills the slots in a single pass and joins the segments. Placeholders
+    with no value in the variables mapping are left exactly as written.
+    """
+
+    __slots__ = ('_segments', '_slots')
+
+    def __init__(self, template: str):
+        segments: List[str] = []
+        slots: List[Tuple[int, str, str]] = []
+        last = 0
+        for match in _PLACEHOLDER.finditer(template):
+            segments.append(template[last:match.start()])
+            slots.append((len(segments), match.group(1), match.group(0)))
+            segments.append(match.group(0))
+            last = match.end()
+        segments.append(template[last:])
+        self._segments = segments
+        self._slots = tuple(slots)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(name for _, name, _ in self._slots))
+
+    def render(self, variables: Mapping[str, str]) -> str:
+        if not self._slots:
+            return self._segments[0]
+        parts = self._segments.copy()
+        for index, name, raw in self._slots:
+            parts[index] = variables.get(name, raw)
+        return ''.join(parts)
+
+
+_cache: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_template(template: str, cache_size: Optional[int] = TEMPLATE_CACHE_SIZE) -> CompiledTemplate:
+    """
+    Compile a template, reusing a cached compilation of identical content.
+
+    Args:
+        template: Template text with {{ Name }} placeholders
+        cache_size: Maximum number of compiled templates kept (LRU); None disables caching
+
+    Returns:
+        CompiledTemplate for the given content
+    """
+    if cache_size is None:
+        return CompiledTemplate(template)
+
+    # Keyed by a content digest so the cache does not pin every template's text as a key
+    key = hashlib.sha256(template.encode()).hexdigest()
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+
+    compiled = CompiledTemplate(template)
+    with _cache_lock:
+        _cache[key] = compiled
+        while len(_cache) > cache_size:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def render_template(template: str, variables: Mapping[str, str]) -> str:
+    """
+    Render a template with the given named variables.
+    """
+    return compile_template(template).render(variables)
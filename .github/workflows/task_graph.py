@@ -0,0 +1,99 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List
+
+from constants import PORT_GRAPH_MAX_WORKERS
+
+
+class TaskGraphError(RuntimeError):
+    """
+    Raised when one or more tasks fail. Dependents of a failed task are skipped.
+    """
+
+    def __init__(self, failures: Dict[str, BaseException], skipped: List[str]):
+        self.failures = failures
+        self.skipped = skipped
+        details = "; ".join(f"{name}: {error}" for name, error in failures.items())
+        super().__init__(f"{len(failures)} task(s) failed ({details})"
+                         + (f", {len(skipped)} skipped" if skipped else ""))
+
+
+class TaskGraph:
+    """
+    Small dependency-graph executor for provisioning flows.
+
+    Each task is a callable that receives the results of its dependencies as positional
+    arguments, in the order the dependencies were declared. Tasks whose dependencies
+    have all succeeded run in parallel on a thread pool, so wall-clock time follows the
+    longest dependency chain rather than the sum of all steps.
+    """
+
+    def __init__(self, max_workers: int = PORT_GRAPH_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Callable[..., Any]] = {}
+        self._deps: Dict[str, List[str]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], *depends_on: str) -> str:
+        if name in self._tasks:
+            raise ValueError(f"Task {name} is already defined")
+        missing = [dep for dep in depends_on if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"Task {name} depends on undefined task(s): {', '.join(missing)}")
+        self._tasks[name] = fn
+        self._deps[name] = list(depends_on)
+        return name
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every task and return a mapping of task name to result.
+
+        Raises:
+            TaskGraphError: If any task raised; its dependents are not run
+        """
+        # Dependencies must be declared before use, so the graph is acyclic by construction
+        dependents: Dict[str, List[str]] = {name: [] for name in self._tasks}
+        waiting = {name: len(deps) for name, deps in self._deps.items()}
+        for name, deps in self._deps.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        results: Dict[str, Any] = {}
+        failures: Dict[str, BaseException] = {}
+        skipped: List[str] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running: Dict[Future, str] = {}
+
+            def submit_ready(names):
+                for ready in names:
+                    args = [results[dep] for dep in self._deps[ready]]
+                    running[executor.submit(self._tasks[ready], *args)] = ready
+
+            def skip_descendants(name):
+                for child in dependents[name]:
+                    if child not in skipped:
+                        skipped.append(child)
+                        skip_descendants(child)
+
+            submit_ready([name for name, count in waiting.items() if count == 0])
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        logging.error(f"Task {name} failed: {error}")
+                        failures[name] = error
+                        skip_descendants(name)
+                        continue
+                    results[name] = future.result()
+                    ready = []
+                    for child in dependents[name]:
+                        waiting[child] -= 1
+                        if waiting[child] == 0 and child not in skipped:
+                            ready.append(child)
+                    submit_ready(ready)
+
+        if failures:
+            raise TaskGraphError(failures, skipped)
+        return results
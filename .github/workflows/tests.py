@@ -1 +1,222 @@
+"""
+Behaviour tests for the workflow helpers. Run from anywhere with:
 
+    python -m pytest .github/workflows/tests.py    (or python .github/workflows/tests.py)
+"""
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from misc_helers import INDEFINITE_DURATION, calculate_time_delta, is_time_bounded, parse_duration
+from models import CloudResource, Environment, EntityModel, ModelValidationError, encode_bulk
+from task_graph import TaskGraph, TaskGraphError
+from ttl_reaper import ExpiryIndex
+from upsert_index import PATCH, SKIP, UPSERT, UpsertIndex
+
+TTL = "2030-01-01T00:00:00.000Z"
+
+
+class ParseDurationTest(unittest.TestCase):
+    def test_count_and_unit(self):
+        self.assertEqual(parse_duration("2 Hours"), timedelta(hours=2))
+        self.assertEqual(parse_duration("3 days"), timedelta(days=3))
+        self.assertEqual(parse_duration(" 1 Week "), timedelta(weeks=1))
+        self.assertEqual(parse_duration("36h"), timedelta(hours=36))
+        self.assertEqual(parse_duration("1.5 d"), timedelta(days=1.5))
+
+    def test_iso_8601(self):
+        self.assertEqual(parse_duration("P1W"), timedelta(weeks=1))
+        self.assertEqual(parse_duration("P2DT12H"), timedelta(days=2, hours=12))
+        self.assertEqual(parse_duration("PT90M"), timedelta(minutes=90))
+        self.assertEqual(parse_duration("pt30s"), timedelta(seconds=30))
+
+    def test_indefinite(self):
+        self.assertEqual(parse_duration("Indefinite"), INDEFINITE_DURATION)
+        self.assertFalse(is_time_bounded("Indefinite"))
+        self.assertTrue(is_time_bounded("1 Day"))
+
+    def test_rejected_inputs(self):
+        for text in ("", None, "P", "PT", "P1DT", "1 year", "2 months", "P1Y", "soon", "-1 day", "1 day 2 hours"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_duration(text)
+
+    def test_out_of_range_is_value_error(self):
+        for text in ("99999999999 days", "P99999999999W"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_duration(text)
+        with self.assertRaises(ValueError):
+            calculate_time_delta("3000000 days")
+
+    def test_calculate_time_delta_format(self):
+        expires_at = calculate_time_delta("1 day")
+        self.assertTrue(expires_at.endswith(".000Z"))
+        parsed = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        self.assertAlmostEqual((parsed - datetime.now(timezone.utc)).total_seconds(), 86400, delta=5)
+
+
+class ModelsTest(unittest.TestCase):
+    def test_entity_model_is_abstract(self):
+        with self.assertRaises(TypeError):
+            EntityModel()
+
+    def test_environment_validation(self):
+        Environment("environment_1", "env 1", "proj", None, TTL)
+        cases = [
+            dict(identifier="bad id"),
+            dict(title=""),
+            dict(project="has space"),
+            dict(triggered_by=42),
+            dict(ttl="tomorrow"),
+            dict(time_bounded="yes"),
+        ]
+        defaults = dict(identifier="environment_1", title="env 1", project="proj", triggered_by="me", ttl=TTL)
+        for override in cases:
+            with self.subTest(**override), self.assertRaises(ModelValidationError):
+                Environment(**dict(defaults, **override))
+
+    def test_cloud_resource_validation(self):
+        CloudResource("cr_1", "environment_1", "EC2", "us-east-1", "running", "me")
+        cases = [
+            ("cr_1", "environment_1", "EC3", "us-east-1", "running", None),
+            ("cr_1", "environment_1", "S3", "mars-1", "running", None),
+            ("cr_1", "environment_1", "S3", "us-east-1", "exploded", None),
+            ("cr_1", "bad env", "S3", "us-east-1", "running", None),
+            ("cr_1", "environment_1", "S3", "us-east-1", "running", 7),
+        ]
+        for args in cases:
+            with self.subTest(args=args), self.assertRaises(ModelValidationError):
+                CloudResource(*args)
+
+    def test_validation_error_is_value_error(self):
+        self.assertTrue(issubclass(ModelValidationError, ValueError))
+
+    def test_encode_bulk(self):
+        env = Environment("environment_1", "ünïcode", "proj", None, TTL, time_bounded=False)
+        body = encode_bulk([env, {"identifier": "raw"}])
+        self.assertIsInstance(body, bytes)
+        self.assertNotIn(b" ", body)
+        self.assertIn("ünïcode".encode(), body)
+        self.assertEqual(json.loads(body), {"entities": [env.to_payload(), {"identifier": "raw"}]})
+        self.assertEqual(env.to_payload()["properties"], {"time_bounded": False, "ttl": TTL})
+        self.assertEqual(encode_bulk([]), b'{"entities":[]}')
+
+    def test_encode_bulk_rejects_nan(self):
+        with self.assertRaises(ValueError):
+            encode_bulk([{"identifier": "x", "properties": {"n": float("nan")}}])
+
+
+class UpsertIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.index = UpsertIndex(self._dir.name, ttl=3600)
+        self.payload = {"identifier": "e1", "title": "E1", "properties": {"a": 1, "b": 2}, "relations": {"p": "x"}}
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_unknown_entity_is_upserted(self):
+        self.assertEqual(self.index.plan("environment", self.payload), (UPSERT, None))
+
+    def test_identical_payload_is_skipped(self):
+        self.index.record("environment", self.payload)
+        self.assertEqual(self.index.plan("environment", json.loads(json.dumps(self.payload))), (SKIP, None))
+
+    def test_changed_fields_are_patched(self):
+        self.index.record("environment", self.payload)
+        changed = dict(self.payload, title="E2", properties={"a": 1, "b": 3, "c": 4})
+        self.assertEqual(self.index.plan("environment", changed),
+                         (PATCH, {"title": "E2", "properties": {"b": 3, "c": 4}}))
+
+    def test_removed_field_is_upserted(self):
+        self.index.record("environment", self.payload)
+        removed = dict(self.payload, properties={"a": 1})
+        self.assertEqual(self.index.plan("environment", removed), (UPSERT, None))
+
+    def test_expired_entry_is_upserted(self):
+        self.index.record("environment", self.payload)
+        self.index._load("environment")["e1"]["written_at"] = time.time() - 3601
+        self.assertEqual(self.index.plan("environment", self.payload), (UPSERT, None))
+
+    def test_save_persists_and_forget_drops(self):
+        self.index.record("environment", self.payload)
+        self.index.save()
+        reloaded = UpsertIndex(self._dir.name, ttl=3600)
+        self.assertEqual(reloaded.plan("environment", self.payload), (SKIP, None))
+        reloaded.forget("environment", "e1")
+        reloaded.save()
+        self.assertEqual(UpsertIndex(self._dir.name).plan("environment", self.payload), (UPSERT, None))
+
+    def test_disabled_without_index_dir(self):
+        index = UpsertIndex("")
+        index.record("environment", self.payload)
+        self.assertEqual(index.plan("environment", self.payload), (UPSERT, None))
+
+
+class TaskGraphTest(unittest.TestCase):
+    def test_results_flow_to_dependents(self):
+        graph = TaskGraph()
+        graph.add("a", lambda: 1)
+        graph.add("b", lambda: 2)
+        graph.add("sum", lambda a, b: a + b, "a", "b")
+        self.assertEqual(graph.run(), {"a": 1, "b": 2, "sum": 3})
+
+    def test_dependents_of_failed_task_are_skipped(self):
+        ran = []
+        lock = threading.Lock()
+
+        def record(name):
+            def task(*_):
+                with lock:
+                    ran.append(name)
+                return name
+            return task
+
+        def fail():
+            raise RuntimeError("boom")
+
+        graph = TaskGraph()
+        graph.add("root", fail)
+        graph.add("child", record("child"), "root")
+        graph.add("grandchild", record("grandchild"), "child")
+        graph.add("independent", record("independent"))
+        with self.assertRaises(TaskGraphError) as raised:
+            graph.run()
+        self.assertEqual(list(raised.exception.failures), ["root"])
+        self.assertEqual(sorted(raised.exception.skipped), ["child", "grandchild"])
+        self.assertEqual(ran, ["independent"])
+
+    def test_undefined_dependency_is_rejected(self):
+        graph = TaskGraph()
+        with self.assertRaises(ValueError):
+            graph.add("a", lambda b: b, "b")
+
+
+class ExpiryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def test_keeps_most_overdue_up_to_limit(self):
+        index = ExpiryIndex(self.now, limit=3)
+        for hours in (5, 1, 9, 3, 7, -2):
+            index.add("environment", f"e{hours}", self.now - timedelta(hours=hours))
+        self.assertEqual(index.expired_total, 5)
+        self.assertEqual([identifier for _, identifier, _ in index.oldest_first()], ["e9", "e7", "e5"])
+        self.assertEqual(index.next_expiry, self.now + timedelta(hours=2))
+
+    def test_unbounded(self):
+        index = ExpiryIndex(self.now, limit=0)
+        for hours in range(1, 11):
+            index.add("cluster", f"c{hours}", self.now - timedelta(hours=hours))
+        self.assertEqual(len(index.oldest_first()), 10)
+        self.assertIsNone(index.next_expiry)
+
+
+if __name__ == "__main__":
+    unittest.main()
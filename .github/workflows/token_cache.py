@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from constants import PORT_TOKEN_CACHE_DIR, PORT_TOKEN_REFRESH_MARGIN
+from file_lock import file_lock
+
+# Fetchers return (access_token, expires_in_seconds or None)
+TokenFetcher = Callable[[], Tuple[str, Optional[int]]]
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """
+    Return the `exp` claim of a JWT as a Unix timestamp, or None if it cannot be read.
+    The signature is not verified; the value is only used to schedule refreshes.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def _cache_key(client_id: str) -> str:
+    return hashlib.sha256(client_id.encode()).hexdigest()[:32]
+
+
+def _thread_lock(key: str) -> threading.Lock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(key, threading.Lock())
+
+
+class TokenCache:
+    """
+    Persistent Port access-token cache keyed by client_id.
+
+    Tokens are stored in private (0600) files and reused until they are within
+    refresh_margin seconds of expiry. Refreshes are single-flight: concurrent threads
+    share an in-process lock and concurrent processes share an advisory file lock,
+    and whoever waits re-reads the cache before fetching.
+    """
+
+    def __init__(self, cache_dir: str = PORT_TOKEN_CACHE_DIR, refresh_margin: int = PORT_TOKEN_REFRESH_MARGIN):
+        self.cache_dir = cache_dir
+        self.refresh_margin = refresh_margin
+
+    def get(self, client_id: str, fetch: TokenFetcher) -> str:
+        if not self.cache_dir:
+            return fetch()[0]
+
+        key = _cache_key(client_id)
+        token = self._read(key)
+        if token:
+            return token
+
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        with _thread_lock(key), file_lock(os.path.join(self.cache_dir, f"{key}.lock")):
+            token = self._read(key)
+            if token:
+                return token
+            token, expires_in = fetch()
+            expires_at = jwt_expiry(token)
+            if expires_at is None and expires_in:
+                expires_at = time.time() + expires_in
+            if expires_at is not None:
+                self._write(key, token, expires_at)
+            return token
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) - self.refresh_margin <= time.time():
+            return None
+        return entry.get("access_token")
+
+    def _write(self, key: str, token: str, expires_at: float):
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"access_token": token, "expires_at": expires_at}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logging.warning(f"Could not persist Port access token cache: {e}")
+
+
+_token_cache = TokenCache()
+
+
+def get_cached_token(client_id: str, fetch: TokenFetcher) -> str:
+    return _token_cache.get(client_id, fetch)
@@ -0,0 +1,189 @@
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from constants import PORT_BULK_MAX_WORKERS, PORT_REAP_MAX_DELETE, PORT_REAP_PAGE_SIZE
+from env_var_helper import get_optional_port_context, get_run_context
+from misc_helers import INDEFINITE_DURATION, parse_timestamp
+
+# Blueprints whose entities carry ttl/time_bounded properties
+TTL_BLUEPRINTS = ("environment", "cluster")
+# Blueprint -> (child blueprint, relation to the parent) deleted before the parent
+DEPENDENTS = {"environment": ("cloudResource", "environment")}
+
+_TIME_BOUNDED = {"combinator": "and", "rules": [{"property": "time_bounded", "operator": "=", "value": True}]}
+_ALL = {"combinator": "and", "rules": []}
+
+# Before time_bounded was derived from the ttl input, "Indefinite" entities were written with
+# time_bounded=true and ttl = creation + INDEFINITE_DURATION. Those are never reaped; this
+# also spares genuine 365-day ttls, which are indistinguishable from them.
+_LEGACY_INDEFINITE_SLACK = timedelta(hours=1)
+
+
+def _headers():
+    headers = get_run_context().auth_headers
+    if not headers:
+        raise RuntimeError("PORT_TOKEN environment variable is not set or empty.")
+    return headers
+
+
+class ExpiryIndex:
+    """
+    Time-ordered index of expired entities, bounded to the `limit` most overdue (0 = unbounded).
+
+    A max-heap on expiry time holds at most `limit` entries, so scanning tens of thousands
+    of entities keeps O(limit) memory; anything less overdue than the heap's top is dropped
+    and will be reaped on a later run. The soonest future expiry is kept for reporting.
+    """
+
+    def __init__(self, now: datetime, limit: int = PORT_REAP_MAX_DELETE):
+        self.now = now
+        self.limit = limit
+        self.expired_total = 0
+        self.next_expiry: Optional[datetime] = None
+        self._heap: List[Tuple[float, str, str]] = []
+
+    def add(self, blueprint: str, identifier: str, expires_at: datetime):
+        if expires_at > self.now:
+            if self.next_expiry is None or expires_at < self.next_expiry:
+                self.next_expiry = expires_at
+            return
+        self.expired_total += 1
+        item = (-expires_at.timestamp(), blueprint, identifier)
+        if self.limit <= 0 or len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def oldest_first(self) -> List[Tuple[str, str, datetime]]:
+        """(blueprint, identifier, expires_at) of the kept entries, most overdue first."""
+        return [(blueprint, identifier, datetime.fromtimestamp(-neg_ts, timezone.utc))
+                for neg_ts, blueprint, identifier in sorted(self._heap, reverse=True)]
+
+
+def is_legacy_indefinite(entity: dict, expires_at: datetime) -> bool:
+    created_at = parse_timestamp(entity.get("createdAt"))
+    return created_at is not None and abs(expires_at - created_at - INDEFINITE_DURATION) <= _LEGACY_INDEFINITE_SLACK
+
+
+def iter_entities(blueprint: str, query: dict, include: Sequence[str],
+                  page_size: int = PORT_REAP_PAGE_SIZE) -> Iterator[dict]:
+    """
+    Stream a blueprint's entities matching query from the search endpoint, one page
+    (page_size entities, only the `include` fields) at a time, following the `next` cursor.
+    """
+    from port_client import get_port_client
+
+    path = f"/blueprints/{quote(blueprint, safe='')}/entities/search"
+    cursor = None
+    while True:
+        body = {"query": query, "include": list(include), "limit": page_size}
+        if cursor:
+            body["from"] = cursor
+        response = get_port_client().post(path, headers=_headers(), data=body, idempotent=True)
+        if response is None or response.status_code != 200:
+            status = "no response" if response is None else f"{response.status_code}: {response.text}"
+            raise RuntimeError(f"Failed to search {blueprint} entities ({status})")
+        page = response.json()
+        yield from page.get("entities", [])
+        cursor = page.get("next")
+        if not cursor:
+            return
+
+
+def delete_entities(targets: Sequence[Tuple[str, str]],
+                    max_workers: int = PORT_BULK_MAX_WORKERS) -> List[Tuple[str, str, str]]:
+    """
+    Delete (blueprint, identifier) pairs with at most max_workers requests in flight.
+    Returns (blueprint, identifier, reason) for every deletion that failed.
+    """
+    from entity_cache import get_entity_cache
+    from port_client import get_port_client
+    from upsert_index import get_upsert_index
+
+    headers = _headers()
+
+    def delete(target: Tuple[str, str]) -> Optional[Tuple[str, str, str]]:
+        blueprint, identifier = target
+        path = f"/blueprints/{quote(blueprint, safe='')}/entities/{quote(identifier, safe='')}"
+        response = get_port_client().request("DELETE", path, headers=headers)
+        if response is None or response.status_code not in (200, 204, 404):
+            return blueprint, identifier, "no response" if response is None else str(response.status_code)
+        get_entity_cache().invalidate(blueprint, identifier)
+        get_upsert_index().forget(blueprint, identifier)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        failures = [error for error in executor.map(delete, targets) if error]
+    get_upsert_index().save()
+    return failures
+
+
+def reap_expired(blueprints: Sequence[str] = TTL_BLUEPRINTS, dry_run: bool = False,
+                 max_delete: int = PORT_REAP_MAX_DELETE, max_workers: int = PORT_BULK_MAX_WORKERS,
+                 page_size: int = PORT_REAP_PAGE_SIZE) -> dict:
+    """
+    Delete time-bounded entities whose ttl has passed, most overdue first and at most
+    max_delete per run. Dependents (cloud resources of an expired environment) are
+    deleted before their parent. Legacy "Indefinite" entities (see is_legacy_indefinite)
+    are kept.
+    """
+    index = ExpiryIndex(datetime.now(timezone.utc), max_delete)
+    scanned = legacy = 0
+    include = ("$identifier", "$createdAt", "ttl", "time_bounded")
+    for blueprint in blueprints:
+        for entity in iter_entities(blueprint, _TIME_BOUNDED, include, page_size):
+            scanned += 1
+            properties = entity.get("properties", {})
+            expires_at = parse_timestamp(properties.get("ttl"))
+            if expires_at is None or not properties.get("time_bounded", True):
+                continue
+            if is_legacy_indefinite(entity, expires_at):
+                legacy += 1
+                continue
+            index.add(blueprint, entity["identifier"], expires_at)
+
+    expired = index.oldest_first()
+    # (child blueprint, child identifier) -> (parent blueprint, parent identifier)
+    dependents = {}
+    for parent_blueprint, (child_blueprint, relation) in DEPENDENTS.items():
+        parents = {identifier for blueprint, identifier, _ in expired if blueprint == parent_blueprint}
+        if not parents:
+            continue
+        for entity in iter_entities(child_blueprint, _ALL, ("$identifier", relation), page_size):
+            parent = entity.get("relations", {}).get(relation)
+            if parent in parents:
+                dependents[(child_blueprint, entity["identifier"])] = (parent_blueprint, parent)
+
+    summary = (f"Scanned {scanned} entities: {index.expired_total} expired, reaping {len(expired)} "
+               f"and {len(dependents)} dependents"
+               + (f"; kept {legacy} legacy Indefinite" if legacy else "")
+               + (f"; next expiry {index.next_expiry.isoformat()}" if index.next_expiry else ""))
+    logging.info(summary)
+    for blueprint, identifier, expires_at in expired:
+        logging.info(f"{'Would delete' if dry_run else 'Deleting'} {blueprint}/{identifier} "
+                     f"(expired {expires_at.isoformat()})")
+    if dry_run:
+        return {"scanned": scanned, "expired": index.expired_total, "deleted": 0}
+
+    failures = delete_entities(list(dependents), max_workers)
+    # A parent whose dependents could not all be removed is kept for the next run
+    blocked = {dependents[(blueprint, identifier)] for blueprint, identifier, _ in failures}
+    parents = [(blueprint, identifier) for blueprint, identifier, _ in expired if (blueprint, identifier) not in blocked]
+    failures += delete_entities(parents, max_workers)
+    failures += [(blueprint, identifier, "dependents not deleted") for blueprint, identifier in blocked]
+    deleted = len(dependents) + len(expired) - len(failures)
+
+    # Scheduled runs have no PORT_CONTEXT; only report to Port when started by an action
+    context = get_optional_port_context()
+    if context:
+        from port import post_log
+        post_log(f'{"❌" if failures else "✅"} {summary}; deleted {deleted}', run_id=context["runId"])
+    for blueprint, identifier, reason in failures:
+        logging.error(f"Failed to delete {blueprint}/{identifier}: {reason}")
+    if failures:
+        raise RuntimeError(f"{len(failures)} expired entities could not be deleted.")
+    return {"scanned": scanned, "expired": index.expired_total, "deleted": deleted}
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from constants import PORT_UPSERT_INDEX_DIR, PORT_UPSERT_INDEX_TTL
+from file_lock import file_lock
+
+SKIP, PATCH, UPSERT = "skip", "patch", "upsert"
+
+# Top-level entity fields compared one by one; properties and relations are compared per key
+_SCALAR_FIELDS = ("title", "icon", "team")
+_MAP_FIELDS = ("properties", "relations")
+
+
+def _digest(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def field_digests(payload: dict) -> Dict[str, str]:
+    """Digest of every top-level field and of every property/relation of an entity payload."""
+    digests = {}
+    for field, value in payload.items():
+        if field in _MAP_FIELDS and isinstance(value, dict):
+            digests.update({f"{field}.{key}": _digest(item) for key, item in value.items()})
+        else:
+            digests[field] = _digest(value)
+    return digests
+
+
+class UnchangedResponse:
+    """Stands in for the API response of an upsert that was skipped because nothing changed."""
+
+    status_code = 200
+    text = ""
+
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def json(self) -> dict:
+        return {"ok": True, "entity": self._payload, "skipped": True}
+
+    def __bool__(self):
+        return True
+
+
+class UpsertIndex:
+    """
+    Digests of the entity payloads this workspace last wrote to Port, per blueprint and
+    identifier, kept across runs in index_dir (one JSON file per blueprint).
+
+    plan() compares a payload with the recorded digests: identical payloads are skipped,
+    payloads whose only differences are changed or added title/icon/team/properties/
+    relations can be sent as a partial PATCH, anything else (removed keys, identifiers
+    never seen, entries older than ttl) is a full upsert. Entries expire after ttl so
+    edits made to an entity outside this workflow are eventually overwritten again.
+
+    The index only knows what this workspace wrote. No workflow caches index_dir, so on
+    hosted runners it starts empty every job and only saves requests within one runner
+    (a command script, the daemon, or reruns on a self-hosted runner). An entity deleted
+    or edited in Port by anything else within ttl is not rewritten unless the caller
+    forces the write (create_entity/create_entities force=True); deletions made by the
+    TTL reaper are dropped from the index.
+    """
+
+    def __init__(self, index_dir: str = PORT_UPSERT_INDEX_DIR, ttl: float = PORT_UPSERT_INDEX_TTL):
+        self.index_dir = index_dir
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, dict]] = {}
+        self._dirty: Dict[str, Dict[str, Optional[dict]]] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, blueprint: str, payload: dict) -> Tuple[str, Optional[dict]]:
+        """
+        Return (SKIP, None), (PATCH, partial payload) or (UPSERT, None) for the payload.
+        """
+        identifier = payload.get("identifier")
+        if not self.index_dir or not identifier:
+            return UPSERT, None
+        with self._lock:
+            entry = self._load(blueprint).get(identifier)
+        if entry is None or time.time() - entry.get("written_at", 0) > self.ttl:
+            return UPSERT, None
+
+        digests = field_digests(payload)
+        recorded = entry["fields"]
+        if set(recorded) - set(digests):
+            return UPSERT, None
+        changed = {field for field, digest in digests.items() if recorded.get(field) != digest}
+        if not changed:
+            return SKIP, None
+        if any("." not in field and field not in _SCALAR_FIELDS for field in changed):
+            return UPSERT, None
+
+        partial = {}
+        for field in changed:
+            if "." in field:
+                group, key = field.split(".", 1)
+                partial.setdefault(group, {})[key] = payload[group][key]
+            else:
+                partial[field] = payload[field]
+        return PATCH, partial
+
+    def record(self, blueprint: str, payload: dict):
+        """Remember a payload that Port has accepted."""
+        identifier = payload.get("identifier")
+        if not self.index_dir or not identifier:
+            return
+        entry = {"written_at": time.time(), "fields": field_digests(payload)}
+        with self._lock:
+            self._load(blueprint)[identifier] = entry
+            self._dirty.setdefault(blueprint, {})[identifier] = entry
+
+    def forget(self, blueprint: str, identifier: str):
+        """Drop the entry of an entity deleted from Port, so re-creating it is a full upsert."""
+        if not self.index_dir:
+            return
+        with self._lock:
+            self._load(blueprint).pop(identifier, None)
+            self._dirty.setdefault(blueprint, {})[identifier] = None
+
+    def save(self):
+        """Merge this process's records into the on-disk index."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            for blueprint, entries in dirty.items():
+                path = self._path(blueprint)
+                with file_lock(f"{path}.lock"):
+                    on_disk = _read_json(path)
+                    for identifier, entry in entries.items():
+                        if entry is None:
+                            on_disk.pop(identifier, None)
+                        else:
+                            on_disk[identifier] = entry
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump(on_disk, f, separators=(",", ":"))
+                    os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not save the upsert index: {e}")
+
+    def _path(self, blueprint: str) -> str:
+        return os.path.join(self.index_dir, f"{hashlib.sha256(blueprint.encode()).hexdigest()[:32]}.json")
+
+    def _load(self, blueprint: str) -> Dict[str, dict]:
+        entries = self._entries.get(blueprint)
+        if entries is None:
+            entries = self._entries[blueprint] = _read_json(self._path(blueprint))
+        return entries
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_upsert_index = UpsertIndex()
+
+
+def get_upsert_index() -> UpsertIndex:
+    return _upsert_index